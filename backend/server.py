@@ -1,25 +1,47 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks, Response, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks, Response, UploadFile, File, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse, JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+from pymongo.errors import PyMongoError, BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Literal
+from typing import List, Optional, Literal, Generic, TypeVar, Union, get_args, get_origin
+from collections import OrderedDict
 import uuid
-from datetime import datetime, timezone, timedelta
+import json
+import csv
+import hashlib
+import asyncio
+from contextlib import asynccontextmanager
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import base64
+from datetime import datetime, timezone, timedelta, date
+from dateutil.relativedelta import relativedelta
 import jwt
 import bcrypt
-from io import BytesIO
+from io import BytesIO, StringIO
 from docx import Document
 from docx.shared import Pt, RGBColor
 from mailmerge import MailMerge
 import random
+import calendar
 import shutil
+import zipfile
+import tempfile
+import time
 import pandas as pd
-from openpyxl import Workbook
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill
 
 ROOT_DIR = Path(__file__).parent
@@ -38,8 +60,86 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 security = HTTPBearer()
 
+# Pagination
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Bulk import
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '1000'))
+IMPORT_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.ndjson', '.jsonl', '.parquet')
+IMPORT_MODES = ('insert', 'upsert')
+# Natural keys an upsert import matches existing records on; each is backed by a unique index
+IMPORT_NATURAL_KEYS = {
+    'clients': ['gst', 'client_name'],
+    'contractors': ['pan'],
+    'employees': ['emp_id'],
+    'assets': ['serial_number'],
+}
+# Fields computed from sheet columns; an upsert refreshes them together with the columns
+IMPORT_DERIVED_FIELDS = ['end_date', 'agreement_status', 'end_date_at', 'dob_mmdd', 'warranty_end_date', 'warranty_status', 'warranty_end_at']
+IMPORT_JOB_CONCURRENCY = int(os.environ.get('IMPORT_JOB_CONCURRENCY', '2'))
+# Error messages kept on a job record; the full count is always reported in error_rows
+IMPORT_JOB_ERROR_LIMIT = 1000
+# Fast-path email check; anything it rejects is re-validated by EmailStr, so it only needs to be conservative
+EMAIL_PATTERN = r'[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*@(?:[a-z0-9]+(?:-+[a-z0-9]+)*\.)+(?!(?:arpa|invalid|local|localhost|onion|test|internal)$)[a-z]{2,24}'
+PAN_PATTERN = r'[A-Z]{5}[0-9]{4}[A-Z]'
+IFSC_PATTERN = r'[A-Z]{4}0[A-Z0-9]{6}'
+
+# Downloads
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+DOCX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Documents pulled from the cursor and encoded per threadpool hop (one Parquet row group each)
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+EXPORT_MEDIA_TYPES = {
+    'xlsx': XLSX_MEDIA_TYPE,
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# Generated exports kept in memory per process, least recently used evicted first
+EXPORT_CACHE_MAX_BYTES = int(os.environ.get('EXPORT_CACHE_MAX_MB', '256')) * 1024 * 1024
+
+# Document generation; templates are read once at startup and merged in memory
+TEMPLATE_DIR = ROOT_DIR / 'template'
+DOCUMENT_TEMPLATES = {
+    'SLA_PPC': 'SLA_PPC.docx',
+    'SLA_SEO': 'SLA_SEO.docx',
+    'NDA': 'NDA_Sample.docx',
+    'ICA': 'ICA_Sample.docx',
+    'OFFER': 'Offer_Letter_Sample.docx',
+}
+# Rendering runs in a process pool; requests beyond the queue limit get a 503 instead of piling up
+DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', str(min(4, os.cpu_count() or 1))))
+DOCUMENT_QUEUE_LIMIT = int(os.environ.get('DOCUMENT_QUEUE_LIMIT', str(DOCUMENT_WORKERS * 4)))
+DOCUMENT_RENDER_TIMEOUT_SECONDS = float(os.environ.get('DOCUMENT_RENDER_TIMEOUT_SECONDS', '30'))
+DOCUMENT_BATCH_MAX = int(os.environ.get('DOCUMENT_BATCH_MAX', '500'))
+# Bump when the built-in layouts in the render_* functions change, so cached documents are re-rendered
+DOCUMENT_LAYOUT_VERSION = 1
+# Rendered documents kept in memory in front of the GridFS store, least recently used evicted first
+DOCUMENT_CACHE_MAX_BYTES = int(os.environ.get('DOCUMENT_CACHE_MAX_MB', '64')) * 1024 * 1024
+
+# In-memory allocation matrix, rebuilt periodically so other workers' writes are picked up
+ALLOCATION_REFRESH = timedelta(seconds=int(os.environ.get('ALLOCATION_REFRESH_SECONDS', '300')))
+
+# Background expiry sweep
+EXPIRY_SWEEP_INTERVAL_SECONDS = int(os.environ.get('EXPIRY_SWEEP_INTERVAL_SECONDS', '3600'))
+
+# Materialized dashboard summary
+DEFAULT_ORG = 'piperocket'
+DASHBOARD_ALERTS_TTL = timedelta(minutes=int(os.environ.get('DASHBOARD_ALERTS_TTL_MINUTES', '15')))
+DASHBOARD_REBUILD_ATTEMPTS = 3
+# A pending marker older than this is taken to be from a writer that died mid-write
+DASHBOARD_PENDING_TIMEOUT = timedelta(minutes=5)
+
 # ============= MODELS =============
 
+T = TypeVar('T')
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 class UserRole(BaseModel):
     role: Literal['Admin', 'Director', 'Staff']
 
@@ -125,6 +225,7 @@ class Contractor(BaseModel):
     tenure_months: int
     end_date: str = ""
     dob: str
+    dob_mmdd: str = ""
     gender: Literal['Male', 'Female', 'Other'] = 'Male'
     pan: str
     aadhar: str
@@ -183,6 +284,7 @@ class Employee(BaseModel):
     last_name: str
     father_name: str
     dob: str
+    dob_mmdd: str = ""
     gender: Literal['Male', 'Female', 'Other'] = 'Male'
     mobile: str
     personal_email: EmailStr
@@ -242,6 +344,8 @@ class Approval(BaseModel):
     approved_at: Optional[str] = None
     notes: Optional[str] = None
     staff_remarks: Optional[str] = None
+    # Content key of the generated agreement, downloadable from GET /api/documents/{document_key}
+    document_key: Optional[str] = None
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
 class ApprovalAction(BaseModel):
@@ -287,6 +391,13 @@ class OfferLetterGenerateRequest(BaseModel):
     position: str
     department: str
 
+class DocumentBatchRequest(BaseModel):
+    document_types: List[Literal['sla', 'nda', 'ica', 'offer_letter']]
+    ids: Optional[List[str]] = None
+    # Same fields as the list routes' filter_* params, e.g. {"agreement_status": "Expired", "end_date_to": "2025-12-31"};
+    # each field applies to the document types whose records have it
+    filter: dict = Field(default_factory=dict)
+
 class Asset(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: f"asset_{uuid.uuid4().hex[:8]}")
@@ -300,6 +411,7 @@ class Asset(BaseModel):
     alloted_to: str
     email: EmailStr
     department: Literal['PPC', 'SEO', 'Content', 'Backlink', 'Business Development', 'Others']
+    warranty_end_date: str = ""
     warranty_status: str = "Active"
     created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
 
@@ -343,18 +455,1097 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise HTTPException(status_code=401, detail="Invalid token")
 
 def calculate_end_date(start_date: str, tenure_months: int) -> str:
-    from dateutil.relativedelta import relativedelta
     start = datetime.fromisoformat(start_date)
     end = start + relativedelta(months=tenure_months)
     return end.isoformat()[:10]
 
+def date_at(iso_date: str) -> Optional[datetime]:
+    """Midnight of an ISO date as a native datetime, so it is stored as a BSON date"""
+    try:
+        return datetime.fromisoformat(iso_date[:10])
+    except (TypeError, ValueError):
+        return None
+
+def check_warranty_status(warranty_end_date: str) -> str:
+    return 'Active' if check_agreement_status(warranty_end_date) == 'Live' else 'Expired'
+
+def current_date() -> date:
+    """Today on the server's local clock; every date-based status, sweep and alert goes through it"""
+    return datetime.now().date()
+
+def today_at() -> datetime:
+    return datetime.combine(current_date(), datetime.min.time())
+
 def check_agreement_status(end_date: str) -> str:
     end = datetime.fromisoformat(end_date)
     # Remove timezone info for comparison
-    today = datetime.now().date()
+    today = current_date()
     end_date_only = end.date() if hasattr(end, 'date') else end
     return 'Live' if today <= end_date_only else 'Expired'
 
+def birthday_key(dob: str) -> str:
+    """Month/day of a date of birth as 'MMDD', the indexed form used for birthday lookups"""
+    try:
+        return datetime.fromisoformat(dob[:10]).strftime('%m%d')
+    except (TypeError, ValueError):
+        return ""
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+def keyset_filter(sort: list, values: list) -> dict:
+    """Match documents that come strictly after `values` in `sort` order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(sort[:i])}
+        if values[i] is None:
+            # Nulls sort first: everything non-null is after them, nothing is before them
+            if direction == -1:
+                continue
+            clause[field] = {'$ne': None}
+        elif direction == -1:
+            # Descending puts nulls (and missing fields) last, and $lt never matches them
+            clause['$or'] = [{field: {'$lt': values[i]}}, {field: None}]
+        else:
+            clause[field] = {'$gt': values[i]}
+        clauses.append(clause)
+    return {'$or': clauses}
+
+async def paginate(collection, query: dict, sort: list, limit: int, after: Optional[str] = None, projection: dict = None) -> dict:
+    """Fetch one keyset page of `collection`, always tie-broken on the unique `id`"""
+    if sort[-1][0] != 'id':
+        sort = sort + [('id', sort[-1][1])]
+    if after:
+        values = decode_cursor(after)
+        if len(values) != len(sort):
+            raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+        after_filter = keyset_filter(sort, values)
+        query = {'$and': [query, after_filter]} if query else after_filter
+    
+    docs = await collection.find(query, projection or {"_id": 0}).sort(sort).limit(limit + 1).to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor([docs[-1].get(field) for field, _ in sort])
+    
+    return {"items": docs, "next_cursor": next_cursor}
+
+# Whitelisted list-route parameters per collection.
+# `filters` maps ?filter_<name>=value to a field, `ranges` accepts ?filter_<field>_from / _to
+# (inclusive) and `sort` lists the only keys ?sort_by may use - each one is index-backed.
+# `compound_sort` lists the only multi-key sorts, each backed by a (a, b, id) index and
+# usable in one direction throughout (a,b or -a,-b).
+LIST_QUERY_SPECS = {
+    'clients': {
+        'filters': {
+            'status': 'client_status',
+            'department': 'service',
+            'service': 'service',
+            'agreement_status': 'agreement_status',
+            'sign_status': 'sign_status',
+            'currency_preference': 'currency_preference',
+        },
+        'ranges': {'start_date': str, 'end_date': str, 'amount_inr': float},
+        'sort': ['client_name', 'start_date', 'end_date', 'amount_inr', 'created_at'],
+        'compound_sort': [('end_date', 'client_name')],
+    },
+    'contractors': {
+        'filters': {
+            'status': 'status',
+            'department': 'department',
+            'agreement_status': 'agreement_status',
+            'sign_status': 'sign_status',
+            'gender': 'gender',
+        },
+        'ranges': {'start_date': str, 'end_date': str, 'monthly_retainer_inr': float},
+        'sort': ['name', 'start_date', 'end_date', 'monthly_retainer_inr', 'created_at'],
+        'compound_sort': [('end_date', 'name')],
+    },
+    'employees': {
+        'filters': {
+            'status': 'status',
+            'department': 'department',
+            'gender': 'gender',
+        },
+        'ranges': {'doj': str, 'monthly_gross_inr': float},
+        'sort': ['first_name', 'emp_id', 'doj', 'monthly_gross_inr', 'created_at'],
+        'compound_sort': [('doj', 'first_name')],
+    },
+    'assets': {
+        'filters': {
+            'department': 'department',
+            'warranty_status': 'warranty_status',
+            'asset_type': 'asset_type',
+        },
+        'ranges': {'purchase_date': str, 'warranty_end_date': str, 'value_ex_gst': float},
+        'sort': ['asset_type', 'purchase_date', 'warranty_end_date', 'value_ex_gst', 'created_at'],
+        'compound_sort': [('asset_type', 'warranty_end_date')],
+    },
+}
+
+def parse_range_value(field: str, value: str, value_type: type):
+    try:
+        if value_type is float:
+            return float(value)
+        # Dates are stored as ISO strings, so validate and compare them as strings
+        datetime.fromisoformat(value)
+        return value
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid value '{value}' for {field}")
+
+def build_list_query(collection: str, params, sort_by: str = None, sort_order: str = 'asc') -> tuple:
+    """Translate whitelisted filter_*/sort_by query params into a Mongo filter and sort"""
+    spec = LIST_QUERY_SPECS[collection]
+    query = {}
+    
+    for key, value in params.items():
+        if not key.startswith('filter_') or value == '':
+            continue
+        name = key[len('filter_'):]
+        if name in spec['filters']:
+            query[spec['filters'][name]] = value
+            continue
+        
+        field, _, bound = name.rpartition('_')
+        if bound not in ('from', 'to') or field not in spec['ranges']:
+            raise HTTPException(status_code=400, detail=f"Unsupported filter '{key}' for {collection}")
+        operator = '$gte' if bound == 'from' else '$lte'
+        query.setdefault(field, {})[operator] = parse_range_value(field, value, spec['ranges'][field])
+    
+    default_direction = -1 if sort_order == 'desc' else 1
+    sort = []
+    for key in (sort_by or '').split(','):
+        key = key.strip()
+        if not key:
+            continue
+        direction = default_direction
+        if key.startswith('-'):
+            key, direction = key[1:], -1
+        if key not in spec['sort'] and key != 'id':
+            raise HTTPException(status_code=400, detail=f"Cannot sort {collection} by '{key}'")
+        sort.append((key, direction))
+    
+    # Anything the indexes can't walk would be sorted in memory over the whole filtered set
+    keys = tuple(key for key, _ in sort if key != 'id')
+    if len(keys) > 1 and keys not in spec['compound_sort']:
+        supported = ', '.join(','.join(pair) for pair in spec['compound_sort'])
+        raise HTTPException(status_code=400, detail=f"Cannot sort {collection} by {','.join(keys)}; multi-key sorts supported: {supported}")
+    if len({direction for _, direction in sort}) > 1:
+        raise HTTPException(status_code=400, detail="Sort keys must all use the same direction")
+    
+    return query, sort or [('id', default_direction)]
+
+class ExportCache:
+    """Size-bounded LRU of generated bytes; versioned keys end in a version that supersedes older ones"""
+    def __init__(self, max_bytes: int, versioned: bool = True):
+        self.max_bytes = max_bytes
+        self.versioned = versioned
+        # A single artifact may take at most a quarter of the budget so one huge export can't flush the rest
+        self.max_entry_bytes = max_bytes // 4
+        self.entries = OrderedDict()
+        self.size = 0
+    
+    def get(self, key: tuple) -> Optional[bytes]:
+        content = self.entries.get(key)
+        if content is not None:
+            self.entries.move_to_end(key)
+        return content
+    
+    def put(self, key: tuple, content: bytes):
+        if len(content) > self.max_entry_bytes or key in self.entries:
+            return
+        # Versions only move forward, so older artifacts of the same export are dead weight; a slow
+        # render finishing after a newer one is itself stale and is not cached
+        if self.versioned:
+            versions = [k for k in self.entries if k[:-1] == key[:-1]]
+            if any(k[-1] > key[-1] for k in versions):
+                return
+            for stale in versions:
+                self.size -= len(self.entries.pop(stale))
+        self.entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+# ============= INDEXES & MIGRATIONS =============
+
+def sort_indexes(collection: str) -> list:
+    # Every whitelisted sort key (and declared multi-key sort) gets a (keys..., id) index so keyset pages stay index-only
+    spec = LIST_QUERY_SPECS.get(collection, {})
+    return [
+        IndexModel([*((key, ASCENDING) for key in keys), ('id', ASCENDING)], name='_'.join(keys) + '_id')
+        for keys in [(key,) for key in spec.get('sort', [])] + list(spec.get('compound_sort', []))
+    ]
+
+# Indexes created at startup, declared per collection
+INDEXES = {
+    'users': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('email', ASCENDING)], unique=True, name='email_unique'),
+    ],
+    'otps': [
+        IndexModel([('email', ASCENDING)], unique=True, name='email_unique'),
+    ],
+    'clients': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('client_status', ASCENDING), ('service', ASCENDING)], name='client_status_service'),
+        IndexModel([('agreement_status', ASCENDING), ('end_date_at', ASCENDING)], name='agreement_status_end_date_at'),
+        IndexModel([('gst', ASCENDING), ('client_name', ASCENDING)], unique=True, name='gst_client_name_unique',
+                   partialFilterExpression={'gst': {'$gt': ''}}),
+        *sort_indexes('clients'),
+    ],
+    'contractors': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('status', ASCENDING), ('department', ASCENDING)], name='status_department'),
+        IndexModel([('status', ASCENDING), ('dob_mmdd', ASCENDING)], name='status_dob_mmdd'),
+        IndexModel([('agreement_status', ASCENDING), ('end_date_at', ASCENDING)], name='agreement_status_end_date_at'),
+        IndexModel([('pan', ASCENDING)], unique=True, name='pan_unique', partialFilterExpression={'pan': {'$gt': ''}}),
+        *sort_indexes('contractors'),
+    ],
+    'employees': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('status', ASCENDING), ('department', ASCENDING)], name='status_department'),
+        IndexModel([('status', ASCENDING), ('dob_mmdd', ASCENDING)], name='status_dob_mmdd'),
+        IndexModel([('emp_id', ASCENDING)], unique=True, name='emp_id_unique', partialFilterExpression={'emp_id': {'$gt': ''}}),
+        IndexModel([('work_email', ASCENDING)], unique=True, name='work_email_unique',
+                   partialFilterExpression={'work_email': {'$gt': ''}}),
+        *sort_indexes('employees'),
+    ],
+    'assets': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('department', ASCENDING)], name='department'),
+        IndexModel([('warranty_status', ASCENDING), ('warranty_end_at', ASCENDING)], name='warranty_status_warranty_end_at'),
+        IndexModel([('serial_number', ASCENDING)], unique=True, name='serial_number_unique',
+                   partialFilterExpression={'serial_number': {'$gt': ''}}),
+        *sort_indexes('assets'),
+    ],
+    'approvals': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+        IndexModel([('status', ASCENDING), ('created_at', DESCENDING)], name='status_created_at'),
+        IndexModel([('created_at', DESCENDING), ('id', DESCENDING)], name='created_at_id'),
+    ],
+    'import_jobs': [
+        IndexModel([('id', ASCENDING)], unique=True, name='id_unique'),
+    ],
+    # Same index GridFS creates on first upload; declared so it exists before the first lookup
+    'documents.files': [
+        IndexModel([('filename', ASCENDING), ('uploadDate', ASCENDING)], name='filename_1_uploadDate_1'),
+    ],
+}
+
+# Which indexes each route relies on, reported by GET /api/admin/indexes
+ROUTE_INDEXES = {
+    'POST /api/auth/login': ['users.email_unique', 'otps.email_unique'],
+    'POST /api/auth/verify-otp': ['users.email_unique', 'otps.email_unique'],
+    'GET /api/auth/me': ['users.id_unique'],
+    'POST /api/users': ['users.email_unique'],
+    'PATCH /api/users/{user_id}': ['users.id_unique'],
+    'DELETE /api/users/{user_id}': ['users.id_unique'],
+    'GET /api/clients': ['clients.client_status_service', 'clients.agreement_status_end_date_at', 'clients.<sort_by>_id'],
+    'GET /api/clients/active-by-department': ['clients.client_status_service'],
+    'PATCH /api/clients/{client_id}': ['clients.id_unique'],
+    'DELETE /api/clients/{client_id}': ['clients.id_unique'],
+    'GET /api/contractors': ['contractors.status_department', 'contractors.agreement_status_end_date_at', 'contractors.<sort_by>_id'],
+    'PATCH /api/contractors/{contractor_id}': ['contractors.id_unique'],
+    'DELETE /api/contractors/{contractor_id}': ['contractors.id_unique'],
+    'GET /api/employees': ['employees.status_department', 'employees.<sort_by>_id'],
+    'PATCH /api/employees/{employee_id}': ['employees.id_unique'],
+    'DELETE /api/employees/{employee_id}': ['employees.id_unique'],
+    'GET /api/assets': ['assets.department', 'assets.warranty_status_warranty_end_at', 'assets.<sort_by>_id'],
+    'PATCH /api/assets/{asset_id}': ['assets.id_unique'],
+    'DELETE /api/assets/{asset_id}': ['assets.id_unique'],
+    'GET /api/approvals': ['approvals.created_at_id'],
+    'POST /api/approvals/{approval_id}/action': ['approvals.id_unique'],
+    'POST /api/approvals/{approval_id}/document': ['approvals.id_unique', 'documents.files.filename_1_uploadDate_1'],
+    'GET /api/documents/{document_key}': ['documents.files.filename_1_uploadDate_1'],
+    'GET /api/dashboard/summary': [
+        'dashboard_summaries._id_',
+        'clients.client_status_service', 'employees.status_dob_mmdd', 'contractors.status_dob_mmdd',
+    ],
+    'GET /api/reports/department-pnl': ['clients.client_status_service', 'employees.status_department', 'contractors.status_department'],
+    'GET /api/reports/client-profitability': ['clients.client_status_service', 'employees.status_department', 'contractors.status_department'],
+    'GET /api/people/birthdays': ['employees.status_dob_mmdd', 'contractors.status_dob_mmdd'],
+    'GET /api/jobs/{job_id}': ['import_jobs.id_unique'],
+    'POST /api/clients/import?mode=upsert': ['clients.gst_client_name_unique'],
+    'POST /api/contractors/import?mode=upsert': ['contractors.pan_unique'],
+    'POST /api/employees/import?mode=upsert': ['employees.emp_id_unique', 'employees.work_email_unique'],
+    'POST /api/assets/import?mode=upsert': ['assets.serial_number_unique'],
+    'expiry sweeper (background)': [
+        'clients.agreement_status_end_date_at', 'contractors.agreement_status_end_date_at',
+        'assets.warranty_status_warranty_end_at',
+    ],
+    'POST /api/dashboard/summary/rebuild': [
+        'clients.client_status_service', 'employees.status_department', 'contractors.status_department',
+        'employees.status_dob_mmdd', 'contractors.status_dob_mmdd',
+    ],
+}
+
+# Index creation failures from the last startup, e.g. duplicate keys blocking a unique index
+index_errors = {}
+
+async def ensure_indexes():
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            name = index.document['name']
+            try:
+                await db[collection].create_indexes([index])
+                index_errors.pop(f'{collection}.{name}', None)
+            except PyMongoError as e:
+                index_errors[f'{collection}.{name}'] = str(e)
+                logger.error(f"Could not create index {collection}.{name}: {str(e)}")
+
+async def backfill_fields(collection: str, missing_field: str, source_fields: list, compute):
+    """Set compute(doc)'s fields on every document that lacks `missing_field`"""
+    ops = []
+    written = 0
+    projection = {"_id": 1, **{f: 1 for f in source_fields}}
+    async for doc in db[collection].find({missing_field: {"$exists": False}}, projection):
+        ops.append(UpdateOne({"_id": doc['_id']}, {"$set": compute(doc)}))
+        if len(ops) >= 1000:
+            await db[collection].bulk_write(ops, ordered=False)
+            written += len(ops)
+            ops = []
+    if ops:
+        await db[collection].bulk_write(ops, ordered=False)
+        written += len(ops)
+    if written:
+        await bump_version(collection)
+
+async def migrate_dob_mmdd():
+    for collection in ('employees', 'contractors'):
+        await backfill_fields(collection, 'dob_mmdd', ['dob'], lambda doc: {'dob_mmdd': birthday_key(doc.get('dob', ''))})
+
+async def migrate_native_expiry_dates():
+    for collection in ('clients', 'contractors'):
+        await backfill_fields(collection, 'end_date_at', ['end_date'], lambda doc: {'end_date_at': date_at(doc.get('end_date', ''))})
+    # Assets' warranty_end_at is backfilled by 0003 alongside warranty_end_date
+
+async def migrate_warranty_end_date():
+    def warranty_fields(doc):
+        try:
+            warranty_end_date = calculate_end_date(doc['purchase_date'][:10], int(doc['warranty_period_months']))
+        except (KeyError, TypeError, ValueError):
+            return {'warranty_end_date': '', 'warranty_end_at': None}
+        return {
+            'warranty_end_date': warranty_end_date,
+            'warranty_end_at': date_at(warranty_end_date),
+            'warranty_status': check_warranty_status(warranty_end_date)
+        }
+    
+    await backfill_fields('assets', 'warranty_end_date', ['purchase_date', 'warranty_period_months'], warranty_fields)
+
+# Data migrations, applied once each in order and recorded in the migrations collection
+MIGRATIONS = [
+    ('0001_backfill_dob_mmdd', migrate_dob_mmdd),
+    ('0002_backfill_native_expiry_dates', migrate_native_expiry_dates),
+    ('0003_backfill_warranty_end_date', migrate_warranty_end_date),
+]
+
+async def run_migrations():
+    applied = {m['_id'] async for m in db.migrations.find({}, {"_id": 1})}
+    for name, migration in MIGRATIONS:
+        if name in applied:
+            continue
+        logger.info(f"Applying migration {name}")
+        await migration()
+        await db.migrations.insert_one({"_id": name, "applied_at": datetime.now(timezone.utc).isoformat()})
+
+# ============= ALLOCATIONS =============
+
+# Resource collections: type label and monthly cost field
+RESOURCE_TYPES = {
+    'employees': ('Employee', 'monthly_gross_inr'),
+    'contractors': ('Contractor', 'monthly_retainer_inr'),
+}
+
+def resource_name(doc: dict) -> str:
+    if 'name' in doc:
+        return doc['name']
+    return f"{doc.get('first_name', '')} {doc.get('last_name', '')}".strip()
+
+def grow(array: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class AllocationMatrix:
+    """Sparse resource x client cost matrix, updated one resource or client at a time.
+
+    A resource's cost is split evenly across its projects, so each row is stored as its
+    client column indices plus one per-entry share. Per-client cost totals are kept as
+    dense column accumulators and a reverse index maps each column to its rows, so both
+    lookups cost O(nnz) of the row or column involved.
+    """
+
+    def __init__(self):
+        self.loaded_at = None
+        self.resource_rows = {}
+        self.row_cols = []
+        self.row_share = np.zeros(0)
+        self.row_info = []
+        self.free_rows = []
+        self.client_cols = {}
+        self.client_ids = []
+        self.client_info = {}
+        self.col_rows = []
+        self.col_cost = {label: np.zeros(0) for label, _ in RESOURCE_TYPES.values()}
+
+    def column(self, client_id: str) -> int:
+        col = self.client_cols.get(client_id)
+        if col is None:
+            col = len(self.client_ids)
+            self.client_cols[client_id] = col
+            self.client_ids.append(client_id)
+            self.col_rows.append(set())
+            for label in self.col_cost:
+                self.col_cost[label] = grow(self.col_cost[label], col + 1)
+        return col
+
+    def remove_resource(self, resource_id: str):
+        row = self.resource_rows.pop(resource_id, None)
+        if row is None:
+            return
+        cols = self.row_cols[row]
+        self.col_cost[self.row_info[row]['type']][cols] -= self.row_share[row]
+        for col in cols:
+            self.col_rows[col].discard(row)
+        self.row_cols[row] = np.zeros(0, dtype=np.int64)
+        self.row_info[row] = None
+        self.free_rows.append(row)
+
+    def set_resource(self, collection: str, doc: dict):
+        """Insert or replace one employee/contractor row; inactive resources drop out"""
+        self.remove_resource(doc['id'])
+        if doc.get('status', 'Active') != 'Active':
+            return
+        
+        label, cost_field = RESOURCE_TYPES[collection]
+        cols = np.array([self.column(c) for c in dict.fromkeys(doc.get('projects') or [])], dtype=np.int64)
+        cost = float(doc.get(cost_field) or 0)
+        share = cost / len(cols) if len(cols) else 0.0
+        
+        if self.free_rows:
+            row = self.free_rows.pop()
+        else:
+            row = len(self.row_cols)
+            self.row_cols.append(None)
+            self.row_info.append(None)
+            self.row_share = grow(self.row_share, row + 1)
+        
+        self.resource_rows[doc['id']] = row
+        self.row_cols[row] = cols
+        self.row_share[row] = share
+        self.row_info[row] = {
+            "id": doc['id'],
+            "name": resource_name(doc),
+            "type": label,
+            "department": doc.get('department', ''),
+            "monthly_cost": cost
+        }
+        self.col_cost[label][cols] += share
+        for col in cols:
+            self.col_rows[col].add(row)
+
+    def set_client(self, doc: dict):
+        self.column(doc['id'])
+        self.client_info[doc['id']] = {
+            "client_name": doc.get('client_name', ''),
+            "department": doc.get('service', ''),
+            "client_status": doc.get('client_status', 'Active'),
+            "revenue": float(doc.get('amount_inr') or 0)
+        }
+
+    def remove_client(self, client_id: str):
+        # Resources may still list the client, so its column stays
+        self.client_info.pop(client_id, None)
+
+    def apply_write(self, collection: str, before: dict = None, after: dict = None):
+        if collection in RESOURCE_TYPES:
+            if after:
+                self.set_resource(collection, after)
+            elif before:
+                self.remove_resource(before['id'])
+        elif collection == 'clients':
+            if after:
+                self.set_client(after)
+            elif before:
+                self.remove_client(before['id'])
+
+    def client_allocation(self, client_id: str) -> Optional[dict]:
+        col = self.client_cols.get(client_id)
+        if col is None and client_id not in self.client_info:
+            return None
+        rows = sorted(self.col_rows[col]) if col is not None else []
+        resources = [{**self.row_info[row], "cost_share": float(self.row_share[row])} for row in rows]
+        costs = {label: float(self.col_cost[label][col]) if col is not None else 0.0 for label in self.col_cost}
+        return {
+            "client_id": client_id,
+            **self.client_info.get(client_id, {}),
+            "resource_count": len(resources),
+            "employee_cost": costs['Employee'],
+            "contractor_cost": costs['Contractor'],
+            "total_cost": sum(costs.values()),
+            "resources": resources
+        }
+
+    def resource_utilization(self, resource_id: str) -> Optional[dict]:
+        row = self.resource_rows.get(resource_id)
+        if row is None:
+            return None
+        share = float(self.row_share[row])
+        clients = [
+            {"client_id": self.client_ids[col], "client_name": self.client_info.get(self.client_ids[col], {}).get('client_name', ''), "cost": share}
+            for col in self.row_cols[row]
+        ]
+        return {**self.row_info[row], "project_count": len(clients), "per_client_cost": share, "clients": clients}
+
+    def utilization(self, department: str = None) -> list:
+        return [
+            self.resource_utilization(resource_id)
+            for resource_id, row in self.resource_rows.items()
+            if not department or self.row_info[row]['department'] == department
+        ]
+
+allocations = AllocationMatrix()
+allocations_lock = asyncio.Lock()
+# Writes made while a rebuild is loading, replayed onto the new matrix (None marks a bulk update);
+# None when no rebuild is running
+allocation_writes = None
+
+async def load_allocations() -> AllocationMatrix:
+    matrix = AllocationMatrix()
+    async for doc in db.clients.find({}, {"_id": 0, "id": 1, "client_name": 1, "service": 1, "client_status": 1, "amount_inr": 1}):
+        matrix.set_client(doc)
+    for collection, (_, cost_field) in RESOURCE_TYPES.items():
+        projection = {"_id": 0, "id": 1, "name": 1, "first_name": 1, "last_name": 1, "department": 1, "status": 1, "projects": 1, cost_field: 1}
+        async for doc in db[collection].find({"status": "Active"}, projection):
+            matrix.set_resource(collection, doc)
+    matrix.loaded_at = datetime.now(timezone.utc)
+    return matrix
+
+async def get_allocations() -> AllocationMatrix:
+    """The process-wide matrix, built on first use and rebuilt once ALLOCATION_REFRESH has passed"""
+    global allocations, allocation_writes
+    if allocations.loaded_at is None or datetime.now(timezone.utc) - allocations.loaded_at > ALLOCATION_REFRESH:
+        async with allocations_lock:
+            if allocations.loaded_at is None or datetime.now(timezone.utc) - allocations.loaded_at > ALLOCATION_REFRESH:
+                allocation_writes = []
+                try:
+                    matrix = await load_allocations()
+                    for write in allocation_writes:
+                        if write is None:
+                            # A bulk update may have landed after its rows were read
+                            matrix.loaded_at = None
+                        else:
+                            matrix.apply_write(*write)
+                finally:
+                    allocation_writes = None
+                allocations = matrix
+    return allocations
+
+def record_allocation_write(collection: str, before: dict = None, after: dict = None):
+    """Apply a write to the live matrix, and queue it for a rebuild that is still loading"""
+    if allocation_writes is not None:
+        allocation_writes.append((collection, before, after))
+    if allocations.loaded_at:
+        allocations.apply_write(collection, before, after)
+
+def invalidate_allocations():
+    if allocation_writes is not None:
+        allocation_writes.append(None)
+    allocations.loaded_at = None
+
+# ============= WRITE HOOKS =============
+
+# Dashboard section, status field, active value, department field and amount field per collection
+SUMMARY_CONTRIBUTIONS = {
+    'clients': ('revenue', 'client_status', 'Active', 'service', 'amount_inr', 'amount'),
+    'employees': ('employees', 'status', 'Active', 'department', 'monthly_gross_inr', 'cost'),
+    'contractors': ('contractors', 'status', 'Active', 'department', 'monthly_retainer_inr', 'cost'),
+}
+
+def summary_contribution(collection: str, doc: dict) -> dict:
+    """What one document adds to the materialized summary, as $inc paths"""
+    if not doc or collection not in SUMMARY_CONTRIBUTIONS:
+        return {}
+    section, status_field, active, dept_field, amount_field, value_key = SUMMARY_CONTRIBUTIONS[collection]
+    if doc.get(status_field, active) != active or not doc.get(dept_field):
+        return {}
+    return {
+        f"{section}.{doc[dept_field]}.count": 1,
+        f"{section}.{doc[dept_field]}.{value_key}": summary_amount(doc.get(amount_field))
+    }
+
+def summary_amount(value) -> float:
+    # Matches the rebuild's $convert: numbers and numeric strings count, anything else adds nothing
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def summary_org(doc: dict) -> str:
+    return (doc or {}).get('org') or DEFAULT_ORG
+
+async def apply_summary_deltas(collection: str, removed: list, added: list):
+    deltas = {}
+    for sign, docs in ((-1, removed), (1, added)):
+        for doc in docs:
+            org_deltas = deltas.setdefault(summary_org(doc), {})
+            for path, value in summary_contribution(collection, doc).items():
+                org_deltas[path] = org_deltas.get(path, 0) + sign * value
+    
+    for org, inc in deltas.items():
+        # Every delta advances the generation, so a rebuild that started earlier won't overwrite it
+        inc = {"generation": 1, **{path: value for path, value in inc.items() if value}}
+        # Only touch summaries that exist; a missing one is rebuilt in full on the next read
+        await db.dashboard_summaries.update_one({"_id": org}, {"$set": {"alerts_stale": True}, "$inc": inc})
+
+@asynccontextmanager
+async def summary_write(collection: str):
+    """Hold a pending marker on the summaries from before a write until after its delta.
+    
+    A rebuild only stores its totals when nothing is pending, so a write whose delta lands after the
+    rebuild has already counted the record can't be counted twice.
+    """
+    if collection not in SUMMARY_CONTRIBUTIONS:
+        yield
+        return
+    pending = {"$inc": {"generation": 1, "pending": 1}, "$set": {"pending_at": datetime.now(timezone.utc).isoformat()}}
+    # The placeholder gives a rebuild that starts mid-write a document to see the marker on
+    await db.dashboard_summaries.update_one({"_id": DEFAULT_ORG}, {**pending, "$setOnInsert": {"building": True}}, upsert=True)
+    await db.dashboard_summaries.update_many({"_id": {"$ne": DEFAULT_ORG}}, pending)
+    try:
+        yield
+    finally:
+        await db.dashboard_summaries.update_many({}, {"$inc": {"generation": 1, "pending": -1}})
+
+async def bump_version(collection: str):
+    """Advance the collection's data version; anything cached against an older version is stale"""
+    await db.collection_versions.update_one({"_id": collection}, {"$inc": {"version": 1}}, upsert=True)
+
+async def collection_version(collection: str) -> int:
+    doc = await db.collection_versions.find_one({"_id": collection})
+    return doc['version'] if doc else 0
+
+async def after_write(collection: str, before: dict = None, after: dict = None):
+    """Keep derived state in step with a single create (before=None), update or delete (after=None)"""
+    await bump_version(collection)
+    await apply_summary_deltas(collection, [before] if before else [], [after] if after else [])
+    record_allocation_write(collection, before, after)
+
+async def after_bulk_insert(collection: str, docs: list):
+    if docs:
+        await bump_version(collection)
+        await apply_summary_deltas(collection, [], docs)
+        for doc in docs:
+            record_allocation_write(collection, after=doc)
+
+async def after_bulk_update(collection: str):
+    """Bulk updates don't return the previous versions, so drop the derived state and let it rebuild on next read"""
+    await bump_version(collection)
+    if collection in SUMMARY_CONTRIBUTIONS:
+        await db.dashboard_summaries.delete_many({})
+    invalidate_allocations()
+
+# ============= DOCUMENT TEMPLATES =============
+
+document_templates = {}
+
+def load_document_templates():
+    """Read each DOCX template once and record the merge fields it exposes"""
+    for name, filename in DOCUMENT_TEMPLATES.items():
+        path = TEMPLATE_DIR / filename
+        if not path.exists():
+            logger.warning(f"Document template {filename} not found")
+            continue
+        content = path.read_bytes()
+        document = MailMerge(BytesIO(content))
+        try:
+            fields = document.get_merge_fields()
+        finally:
+            document.close()
+        document_templates[name] = {'content': content, 'fields': fields, 'version': hashlib.sha256(content).hexdigest()[:16]}
+        if not fields:
+            logger.info(f"Document template {filename} has no merge fields, generated documents use the built-in layout")
+
+def merge_template(name: str, merge_data: dict) -> Optional[bytes]:
+    """Mail-merge a registered template into memory; None if it isn't loaded or has nothing to merge"""
+    template = document_templates.get(name)
+    if not template or not template['fields']:
+        return None
+    document = MailMerge(BytesIO(template['content']))
+    try:
+        document.merge(**{field: merge_data.get(field, '') for field in template['fields']})
+        output = BytesIO()
+        document.write(output)
+    finally:
+        document.close()
+    return output.getvalue()
+
+def render_sla(data: dict) -> bytes:
+    merge_data = {
+        'client_name': data['client_name'],
+        'address': data['address'],
+        'start_date': data['start_date'],
+        'tenure_months': str(data['tenure_months']),
+        'service': data['service'],
+        'currency': data['currency_preference'],
+        'authorised_signatory': data['authorised_signatory'],
+        'designation': data['designation'],
+    }
+    
+    if data['service'] == 'Both':
+        merge_data['amount_ppc'] = str(data['amount_ppc']) if data['amount_ppc'] else '0'
+        merge_data['amount_seo'] = str(data['amount_seo']) if data['amount_seo'] else '0'
+        merge_data['amount'] = str((data['amount_ppc'] or 0) + (data['amount_seo'] or 0))
+    else:
+        merge_data['amount'] = str(data['amount']) if data['amount'] else '0'
+    
+    try:
+        content = merge_template('SLA_SEO' if data['service'] == 'SEO' else 'SLA_PPC', merge_data)
+        if content:
+            return content
+    except Exception as e:
+        logger.error(f"Template merge error: {str(e)}")
+        # Fall through to simple generation
+    
+    # Fallback: Generate simple document
+    doc = Document()
+    
+    # Add header with logo placeholder
+    header = doc.sections[0].header
+    header_para = header.paragraphs[0]
+    header_para.text = "PIPEROCKET"
+    header_para.style.font.size = Pt(16)
+    header_para.style.font.bold = True
+    
+    # Title
+    title = doc.add_paragraph()
+    title_run = title.add_run('SERVICE LEVEL AGREEMENT')
+    title_run.bold = True
+    title_run.font.size = Pt(18)
+    title.alignment = 1  # Center
+    
+    doc.add_paragraph()  # Spacing
+    
+    # Agreement details
+    doc.add_paragraph(f"This Service Level Agreement (\"SLA\") is entered into on {data['start_date']}")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"Client Name: {data['client_name']}")
+    doc.add_paragraph(f"Address: {data['address']}")
+    doc.add_paragraph(f"Service Type: {data['service']}")
+    
+    if data['service'] == 'Both':
+        doc.add_paragraph(f"PPC Service Fee: {data['currency_preference']} {data['amount_ppc']:,.2f}")
+        doc.add_paragraph(f"SEO Service Fee: {data['currency_preference']} {data['amount_seo']:,.2f}")
+        doc.add_paragraph(f"Total Monthly Fee: {data['currency_preference']} {(data['amount_ppc'] + data['amount_seo']):,.2f}")
+    else:
+        doc.add_paragraph(f"Monthly Service Fee: {data['currency_preference']} {data['amount']:,.2f}")
+    
+    doc.add_paragraph(f"Contract Period: {data['tenure_months']} months")
+    doc.add_paragraph()
+    
+    # Signature section
+    doc.add_paragraph("For and on behalf of the Client:")
+    doc.add_paragraph()
+    doc.add_paragraph(f"Name: {data['authorised_signatory']}")
+    doc.add_paragraph(f"Designation: {data['designation']}")
+    doc.add_paragraph(f"Date: ________________")
+    doc.add_paragraph(f"Signature: ________________")
+    
+    bio = BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+def render_nda(data: dict) -> bytes:
+    try:
+        content = merge_template('NDA', {key: str(value) for key, value in data.items()})
+        if content:
+            return content
+    except Exception as e:
+        logger.error(f"Template merge error: {str(e)}")
+    
+    # Generate simple NDA document
+    doc = Document()
+    
+    # Header
+    header = doc.sections[0].header
+    header_para = header.paragraphs[0]
+    header_para.text = "PIPEROCKET"
+    header_para.style.font.size = Pt(16)
+    header_para.style.font.bold = True
+    
+    # Title
+    title = doc.add_paragraph()
+    title_run = title.add_run('NON-DISCLOSURE AGREEMENT')
+    title_run.bold = True
+    title_run.font.size = Pt(18)
+    title.alignment = 1
+    
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"This Non-Disclosure Agreement (\"NDA\") is entered into on {data['start_date']}")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"Client Name: {data['client_name']}")
+    doc.add_paragraph(f"Address: {data['address']}")
+    doc.add_paragraph()
+    
+    doc.add_paragraph("This agreement governs the disclosure of confidential information between the parties.")
+    doc.add_paragraph()
+    
+    # Signature section
+    doc.add_paragraph("For and on behalf of the Client:")
+    doc.add_paragraph()
+    doc.add_paragraph(f"Name: {data['authorised_signatory']}")
+    doc.add_paragraph(f"Designation: {data['designation']}")
+    doc.add_paragraph(f"Date: ________________")
+    doc.add_paragraph(f"Signature: ________________")
+    
+    bio = BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+def render_ica(data: dict) -> bytes:
+    try:
+        content = merge_template('ICA', {key: str(value) for key, value in data.items()})
+        if content:
+            return content
+    except Exception as e:
+        logger.error(f"Template merge error: {str(e)}")
+    
+    # Generate simple ICA document
+    doc = Document()
+    
+    # Header
+    header = doc.sections[0].header
+    header_para = header.paragraphs[0]
+    header_para.text = "PIPEROCKET"
+    header_para.style.font.size = Pt(16)
+    header_para.style.font.bold = True
+    
+    # Title
+    title = doc.add_paragraph()
+    title_run = title.add_run('INDEPENDENT CONTRACTOR AGREEMENT')
+    title_run.bold = True
+    title_run.font.size = Pt(18)
+    title.alignment = 1
+    
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"This Independent Contractor Agreement is entered into on {data['start_date']}")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"Contractor Name: {data['contractor_name']}")
+    doc.add_paragraph(f"Address: {data['address']}")
+    doc.add_paragraph(f"Designation: {data['designation']}")
+    doc.add_paragraph(f"Monthly Retainer: INR {data['amount_inr']:,.2f}")
+    doc.add_paragraph(f"Contract Period: {data['tenure_months']} months")
+    doc.add_paragraph()
+    
+    doc.add_paragraph("Terms and Conditions:")
+    doc.add_paragraph("1. The Contractor agrees to provide services as per the scope of work.")
+    doc.add_paragraph("2. Payment shall be made on a monthly basis.")
+    doc.add_paragraph("3. This agreement can be terminated by either party with 30 days notice.")
+    doc.add_paragraph()
+    
+    # Signature section
+    doc.add_paragraph("Contractor Signature:")
+    doc.add_paragraph()
+    doc.add_paragraph(f"Name: {data['contractor_name']}")
+    doc.add_paragraph(f"Date: ________________")
+    doc.add_paragraph(f"Signature: ________________")
+    
+    bio = BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+def render_offer_letter(data: dict) -> bytes:
+    # Calculate CTC
+    gross_annual = data['gross_salary_lpa'] * 100000
+    ctc_annual = gross_annual + 21600
+    monthly_ctc = ctc_annual / 12
+    monthly_gross = gross_annual / 12
+    
+    merge_data = {key: str(value) for key, value in data.items()}
+    merge_data.update({
+        'gross_annual': f"{gross_annual:,.2f}",
+        'ctc_annual': f"{ctc_annual:,.2f}",
+        'monthly_ctc': f"{monthly_ctc:,.2f}",
+        'monthly_gross': f"{monthly_gross:,.2f}",
+    })
+    try:
+        content = merge_template('OFFER', merge_data)
+        if content:
+            return content
+    except Exception as e:
+        logger.error(f"Template merge error: {str(e)}")
+    
+    # Generate offer letter document
+    doc = Document()
+    
+    # Header
+    header = doc.sections[0].header
+    header_para = header.paragraphs[0]
+    header_para.text = "PIPEROCKET"
+    header_para.style.font.size = Pt(16)
+    header_para.style.font.bold = True
+    
+    # Title
+    title = doc.add_paragraph()
+    title_run = title.add_run('OFFER LETTER')
+    title_run.bold = True
+    title_run.font.size = Pt(18)
+    title.alignment = 1
+    
+    doc.add_paragraph()
+    doc.add_paragraph(f"Date: {data['date']}")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"Dear {data['employee_name']},")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"We are pleased to offer you the position of {data['position']} in the {data['department']} department.")
+    doc.add_paragraph()
+    
+    doc.add_paragraph("Compensation Details:")
+    doc.add_paragraph(f"• Gross Annual Salary: INR {gross_annual:,.2f}")
+    doc.add_paragraph(f"• Cost to Company (Annual): INR {ctc_annual:,.2f}")
+    doc.add_paragraph(f"• Monthly CTC: INR {monthly_ctc:,.2f}")
+    doc.add_paragraph(f"• Monthly Gross: INR {monthly_gross:,.2f}")
+    doc.add_paragraph()
+    
+    # Salary breakdown table
+    doc.add_paragraph("Monthly Salary Breakdown:")
+    
+    # Calculate components
+    basic = monthly_gross * 0.50
+    hra = monthly_gross * 0.30
+    special = monthly_gross * 0.20
+    
+    doc.add_paragraph(f"• Basic Salary: INR {basic:,.2f}")
+    doc.add_paragraph(f"• HRA: INR {hra:,.2f}")
+    doc.add_paragraph(f"• Special Allowance: INR {special:,.2f}")
+    doc.add_paragraph(f"• Employer PF Contribution: INR 1,800.00")
+    doc.add_paragraph()
+    
+    doc.add_paragraph(f"Please sign and return this offer letter before {data['sign_before_date']}.")
+    doc.add_paragraph()
+    
+    doc.add_paragraph("We look forward to welcoming you to our team!")
+    doc.add_paragraph()
+    doc.add_paragraph("Sincerely,")
+    doc.add_paragraph("Piperocket HR Team")
+    doc.add_paragraph()
+    doc.add_paragraph()
+    
+    doc.add_paragraph("Employee Acceptance:")
+    doc.add_paragraph()
+    doc.add_paragraph(f"Name: {data['employee_name']}")
+    doc.add_paragraph(f"Date: ________________")
+    doc.add_paragraph(f"Signature: ________________")
+    
+    bio = BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+# Workers are spawned rather than forked so they don't inherit the event loop and Mongo client threads
+document_pool: Optional[ProcessPoolExecutor] = None
+document_slots = asyncio.Semaphore(DOCUMENT_QUEUE_LIMIT)
+
+def start_document_pool():
+    global document_pool
+    document_pool = ProcessPoolExecutor(
+        max_workers=DOCUMENT_WORKERS,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=load_document_templates,
+    )
+
+def release_document_slot(future: asyncio.Future):
+    document_slots.release()
+    if not future.cancelled():
+        future.exception()  # retrieved here so a render that outlived its request isn't logged as unhandled
+
+async def render_document(renderer, data: dict, wait: bool = False) -> bytes:
+    """Run a top-level renderer in the process pool; 503 when the queue is full unless wait, 504 past the timeout"""
+    if document_slots.locked() and not wait:
+        raise HTTPException(status_code=503, detail="Document generation is busy, please retry shortly", headers={'Retry-After': '5'})
+    await document_slots.acquire()
+    future = asyncio.get_running_loop().run_in_executor(document_pool, renderer, data)
+    # A render that times out keeps its worker busy, so its slot is only freed once it actually finishes
+    future.add_done_callback(release_document_slot)
+    try:
+        return await asyncio.wait_for(asyncio.shield(future), DOCUMENT_RENDER_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Document generation timed out")
+
+document_cache = ExportCache(DOCUMENT_CACHE_MAX_BYTES, versioned=False)
+
+def document_key(renderer, data: dict) -> str:
+    """Content address of a rendered document: the renderer, template and layout versions, and the merge data"""
+    payload = {
+        'renderer': renderer.__name__,
+        'layout': DOCUMENT_LAYOUT_VERSION,
+        'templates': {name: template['version'] for name, template in document_templates.items()},
+        'data': data,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def document_bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name='documents')
+
+async def load_stored_document(key: str) -> Optional[bytes]:
+    try:
+        stream = await document_bucket().open_download_stream_by_name(key)
+        return await stream.read()
+    except NoFile:
+        return None
+    except PyMongoError as e:
+        logger.warning(f"Document store read failed for {key}: {str(e)}")
+        return None
+
+async def store_document(key: str, content: bytes, filename: str):
+    # Concurrent first renders may both upload; the copies are identical and lookups take the newest
+    try:
+        await document_bucket().upload_from_stream(key, content, metadata={'download_name': filename})
+    except PyMongoError as e:
+        logger.warning(f"Document store write failed for {key}: {str(e)}")
+
+async def cached_document(renderer, data: dict, filename: str, wait: bool = False) -> tuple:
+    """Serve a document from the in-process LRU, then GridFS, rendering and storing it only on a miss"""
+    key = document_key(renderer, data)
+    content = document_cache.get((key,))
+    if content is None:
+        content = await load_stored_document(key)
+        if content is None:
+            content = await render_document(renderer, data, wait)
+            await store_document(key, content, filename)
+        document_cache.put((key,), content)
+    return key, content
+
+def docx_response(content: bytes, filename: str, key: str = None) -> Response:
+    headers = {'Content-Disposition': f'attachment; filename="{filename}"'}
+    if key:
+        # Content-addressed, so the bytes behind a key never change
+        headers.update({'X-Document-Key': key, 'ETag': f'"{key}"', 'Cache-Control': 'private, max-age=31536000, immutable'})
+    return Response(content=content, media_type=DOCX_MEDIA_TYPE, headers=headers)
+
 # ============= AUTH ROUTES =============
 
 @api_router.post("/auth/login")
@@ -485,28 +1676,18 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_current_use
 
 # ============= CLIENT ROUTES =============
 
-@api_router.get("/clients", response_model=List[Client])
+@api_router.get("/clients", response_model=Page[Client])
 async def get_clients(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     sort_by: str = None,
     sort_order: str = 'asc',
-    filter_status: str = None,
-    filter_department: str = None
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
 ):
-    query = {}
-    if filter_status:
-        query['client_status'] = filter_status
-    if filter_department:
-        query['service'] = filter_department
-    
-    clients = await db.clients.find(query, {"_id": 0}).to_list(1000)
-    
-    # Sorting
-    if sort_by:
-        reverse = sort_order == 'desc'
-        clients.sort(key=lambda x: x.get(sort_by, ''), reverse=reverse)
-    
-    return clients
+    """List clients; filter with filter_<field>[_from|_to], sort with sort_by=-a or a declared pair a,b"""
+    query, sort = build_list_query('clients', request.query_params, sort_by, sort_order)
+    return await paginate(db.clients, query, sort, limit, after)
 
 @api_router.get("/clients/active-by-department")
 async def get_active_clients_by_department(
@@ -529,7 +1710,10 @@ async def create_client(client_data: ClientCreate, current_user: dict = Depends(
     client.agreement_status = check_agreement_status(client.end_date)
     
     doc = client.model_dump()
-    await db.clients.insert_one(doc)
+    doc['end_date_at'] = date_at(client.end_date)
+    async with summary_write('clients'):
+        await db.clients.insert_one(doc)
+        await after_write('clients', after=doc)
     return client
 
 @api_router.patch("/clients/{client_id}")
@@ -545,9 +1729,13 @@ async def update_client(client_id: str, update_data: dict, current_user: dict =
                 end_date = calculate_end_date(start_date, tenure_months)
                 agreement_status = check_agreement_status(end_date)
                 update_data['end_date'] = end_date
+                update_data['end_date_at'] = date_at(end_date)
                 update_data['agreement_status'] = agreement_status
     
-    await db.clients.update_one({"id": client_id}, {"$set": update_data})
+    async with summary_write('clients'):
+        before = await db.clients.find_one_and_update({"id": client_id}, {"$set": update_data}, {"_id": 0})
+        if before:
+            await after_write('clients', before, {**before, **update_data})
     return {"message": "Client updated successfully"}
 
 @api_router.delete("/clients/{client_id}")
@@ -556,203 +1744,53 @@ async def delete_client(client_id: str, current_user: dict = Depends(get_current
     if current_user['role'] not in ['Admin', 'Director']:
         raise HTTPException(status_code=403, detail="Only Admin and Director can delete clients")
     
-    result = await db.clients.delete_one({"id": client_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Client not found")
+    async with summary_write('clients'):
+        deleted = await db.clients.find_one_and_delete({"id": client_id}, {"_id": 0})
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Client not found")
+        await after_write('clients', before=deleted)
     
     return {"message": "Client deleted successfully"}
 
 @api_router.post("/clients/generate-sla")
 async def generate_sla(request: SLAGenerateRequest):
-    try:
-        # Try template-based generation first
-        if request.service == 'PPC':
-            template_path = ROOT_DIR / 'templates' / 'SLA_PPC.docx'
-        elif request.service == 'SEO':
-            template_path = ROOT_DIR / 'templates' / 'SLA_SEO.docx'
-        else:
-            template_path = ROOT_DIR / 'templates' / 'SLA_PPC.docx'
-        
-        if template_path.exists():
-            try:
-                output_path = f"/tmp/SLA_{request.client_name.replace(' ', '_')}_{uuid.uuid4().hex[:6]}.docx"
-                shutil.copy(template_path, output_path)
-                
-                merge_data = {
-                    'client_name': request.client_name,
-                    'address': request.address,
-                    'start_date': request.start_date,
-                    'tenure_months': str(request.tenure_months),
-                    'service': request.service,
-                    'currency': request.currency_preference,
-                    'authorised_signatory': request.authorised_signatory,
-                    'designation': request.designation,
-                }
-                
-                if request.service == 'Both':
-                    merge_data['amount_ppc'] = str(request.amount_ppc) if request.amount_ppc else '0'
-                    merge_data['amount_seo'] = str(request.amount_seo) if request.amount_seo else '0'
-                    merge_data['amount'] = str((request.amount_ppc or 0) + (request.amount_seo or 0))
-                else:
-                    merge_data['amount'] = str(request.amount) if request.amount else '0'
-                
-                document = MailMerge(output_path)
-                document.merge(**merge_data)
-                document.write(output_path)
-                
-                with open(output_path, 'rb') as f:
-                    content = f.read()
-                
-                return Response(
-                    content=content,
-                    media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                    headers={'Content-Disposition': f'attachment; filename="SLA_{request.client_name.replace(" ", "_")}.docx"'}
-                )
-            except Exception as template_error:
-                logger.error(f"Template merge error: {str(template_error)}")
-                # Fall through to simple generation
-        
-    except Exception as e:
-        logger.error(f"SLA generation error: {str(e)}")
-    
-    # Fallback: Generate simple document
-    doc = Document()
-    
-    # Add header with logo placeholder
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = "PIPEROCKET"
-    header_para.style.font.size = Pt(16)
-    header_para.style.font.bold = True
-    
-    # Title
-    title = doc.add_paragraph()
-    title_run = title.add_run('SERVICE LEVEL AGREEMENT')
-    title_run.bold = True
-    title_run.font.size = Pt(18)
-    title.alignment = 1  # Center
-    
-    doc.add_paragraph()  # Spacing
-    
-    # Agreement details
-    doc.add_paragraph(f"This Service Level Agreement (\"SLA\") is entered into on {request.start_date}")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"Client Name: {request.client_name}")
-    doc.add_paragraph(f"Address: {request.address}")
-    doc.add_paragraph(f"Service Type: {request.service}")
-    
-    if request.service == 'Both':
-        doc.add_paragraph(f"PPC Service Fee: {request.currency_preference} {request.amount_ppc:,.2f}")
-        doc.add_paragraph(f"SEO Service Fee: {request.currency_preference} {request.amount_seo:,.2f}")
-        doc.add_paragraph(f"Total Monthly Fee: {request.currency_preference} {(request.amount_ppc + request.amount_seo):,.2f}")
-    else:
-        doc.add_paragraph(f"Monthly Service Fee: {request.currency_preference} {request.amount:,.2f}")
-    
-    doc.add_paragraph(f"Contract Period: {request.tenure_months} months")
-    doc.add_paragraph()
-    
-    # Signature section
-    doc.add_paragraph("For and on behalf of the Client:")
-    doc.add_paragraph()
-    doc.add_paragraph(f"Name: {request.authorised_signatory}")
-    doc.add_paragraph(f"Designation: {request.designation}")
-    doc.add_paragraph(f"Date: ________________")
-    doc.add_paragraph(f"Signature: ________________")
-    
-    # Save to BytesIO
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    
-    return Response(
-        content=bio.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        headers={'Content-Disposition': f'attachment; filename="SLA_{request.client_name.replace(" ", "_")}.docx"'}
-    )
+    filename = f"SLA_{request.client_name.replace(' ', '_')}.docx"
+    key, content = await cached_document(render_sla, request.model_dump(), filename)
+    return docx_response(content, filename, key)
 
 @api_router.post("/clients/generate-nda")
 async def generate_nda(request: NDAGenerateRequest):
-    # Generate simple NDA document
-    doc = Document()
-    
-    # Header
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = "PIPEROCKET"
-    header_para.style.font.size = Pt(16)
-    header_para.style.font.bold = True
-    
-    # Title
-    title = doc.add_paragraph()
-    title_run = title.add_run('NON-DISCLOSURE AGREEMENT')
-    title_run.bold = True
-    title_run.font.size = Pt(18)
-    title.alignment = 1
-    
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"This Non-Disclosure Agreement (\"NDA\") is entered into on {request.start_date}")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"Client Name: {request.client_name}")
-    doc.add_paragraph(f"Address: {request.address}")
-    doc.add_paragraph()
-    
-    doc.add_paragraph("This agreement governs the disclosure of confidential information between the parties.")
-    doc.add_paragraph()
-    
-    # Signature section
-    doc.add_paragraph("For and on behalf of the Client:")
-    doc.add_paragraph()
-    doc.add_paragraph(f"Name: {request.authorised_signatory}")
-    doc.add_paragraph(f"Designation: {request.designation}")
-    doc.add_paragraph(f"Date: ________________")
-    doc.add_paragraph(f"Signature: ________________")
-    
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    
-    return Response(
-        content=bio.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        headers={'Content-Disposition': f'attachment; filename="NDA_{request.client_name.replace(" ", "_")}.docx"'}
-    )
+    filename = f"NDA_{request.client_name.replace(' ', '_')}.docx"
+    key, content = await cached_document(render_nda, request.model_dump(), filename)
+    return docx_response(content, filename, key)
 
 # ============= CONTRACTOR ROUTES =============
 
-@api_router.get("/contractors", response_model=List[Contractor])
+@api_router.get("/contractors", response_model=Page[Contractor])
 async def get_contractors(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     sort_by: str = None,
     sort_order: str = 'asc',
-    filter_status: str = None,
-    filter_department: str = None
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
 ):
-    query = {}
-    if filter_status:
-        query['status'] = filter_status
-    if filter_department:
-        query['department'] = filter_department
-    
-    contractors = await db.contractors.find(query, {"_id": 0}).to_list(1000)
-    
-    # Sorting
-    if sort_by:
-        reverse = sort_order == 'desc'
-        contractors.sort(key=lambda x: x.get(sort_by, ''), reverse=reverse)
-    
-    return contractors
+    """List contractors; filter with filter_<field>[_from|_to], sort with sort_by=-a or a declared pair a,b"""
+    query, sort = build_list_query('contractors', request.query_params, sort_by, sort_order)
+    return await paginate(db.contractors, query, sort, limit, after)
 
 @api_router.post("/contractors", response_model=Contractor)
 async def create_contractor(contractor_data: ContractorCreate, current_user: dict = Depends(get_current_user)):
     contractor = Contractor(**contractor_data.model_dump())
     contractor.end_date = calculate_end_date(contractor.start_date, contractor.tenure_months)
     contractor.agreement_status = check_agreement_status(contractor.end_date)
+    contractor.dob_mmdd = birthday_key(contractor.dob)
     
     doc = contractor.model_dump()
-    await db.contractors.insert_one(doc)
+    doc['end_date_at'] = date_at(contractor.end_date)
+    async with summary_write('contractors'):
+        await db.contractors.insert_one(doc)
+        await after_write('contractors', after=doc)
     return contractor
 
 @api_router.patch("/contractors/{contractor_id}")
@@ -768,9 +1806,16 @@ async def update_contractor(contractor_id: str, update_data: dict, current_user:
                 end_date = calculate_end_date(start_date, tenure_months)
                 agreement_status = check_agreement_status(end_date)
                 update_data['end_date'] = end_date
+                update_data['end_date_at'] = date_at(end_date)
                 update_data['agreement_status'] = agreement_status
     
-    await db.contractors.update_one({"id": contractor_id}, {"$set": update_data})
+    if 'dob' in update_data:
+        update_data['dob_mmdd'] = birthday_key(update_data['dob'])
+    
+    async with summary_write('contractors'):
+        before = await db.contractors.find_one_and_update({"id": contractor_id}, {"$set": update_data}, {"_id": 0})
+        if before:
+            await after_write('contractors', before, {**before, **update_data})
     return {"message": "Contractor updated successfully"}
 
 @api_router.delete("/contractors/{contractor_id}")
@@ -779,102 +1824,55 @@ async def delete_contractor(contractor_id: str, current_user: dict = Depends(get
     if current_user['role'] not in ['Admin', 'Director']:
         raise HTTPException(status_code=403, detail="Only Admin and Director can delete contractors")
     
-    result = await db.contractors.delete_one({"id": contractor_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Contractor not found")
+    async with summary_write('contractors'):
+        deleted = await db.contractors.find_one_and_delete({"id": contractor_id}, {"_id": 0})
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Contractor not found")
+        await after_write('contractors', before=deleted)
     
     return {"message": "Contractor deleted successfully"}
 
 @api_router.post("/contractors/generate-ica")
 async def generate_ica(request: ICAGenerateRequest):
-    # Generate simple ICA document
-    doc = Document()
-    
-    # Header
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = "PIPEROCKET"
-    header_para.style.font.size = Pt(16)
-    header_para.style.font.bold = True
-    
-    # Title
-    title = doc.add_paragraph()
-    title_run = title.add_run('INDEPENDENT CONTRACTOR AGREEMENT')
-    title_run.bold = True
-    title_run.font.size = Pt(18)
-    title.alignment = 1
-    
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"This Independent Contractor Agreement is entered into on {request.start_date}")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"Contractor Name: {request.contractor_name}")
-    doc.add_paragraph(f"Address: {request.address}")
-    doc.add_paragraph(f"Designation: {request.designation}")
-    doc.add_paragraph(f"Monthly Retainer: INR {request.amount_inr:,.2f}")
-    doc.add_paragraph(f"Contract Period: {request.tenure_months} months")
-    doc.add_paragraph()
-    
-    doc.add_paragraph("Terms and Conditions:")
-    doc.add_paragraph("1. The Contractor agrees to provide services as per the scope of work.")
-    doc.add_paragraph("2. Payment shall be made on a monthly basis.")
-    doc.add_paragraph("3. This agreement can be terminated by either party with 30 days notice.")
-    doc.add_paragraph()
-    
-    # Signature section
-    doc.add_paragraph("Contractor Signature:")
-    doc.add_paragraph()
-    doc.add_paragraph(f"Name: {request.contractor_name}")
-    doc.add_paragraph(f"Date: ________________")
-    doc.add_paragraph(f"Signature: ________________")
-    
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    
-    return Response(
-        content=bio.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        headers={'Content-Disposition': f'attachment; filename="ICA_{request.contractor_name.replace(" ", "_")}.docx"'}
-    )
+    filename = f"ICA_{request.contractor_name.replace(' ', '_')}.docx"
+    key, content = await cached_document(render_ica, request.model_dump(), filename)
+    return docx_response(content, filename, key)
 
 # ============= EMPLOYEE ROUTES =============
 
-@api_router.get("/employees", response_model=List[Employee])
+@api_router.get("/employees", response_model=Page[Employee])
 async def get_employees(
+    request: Request,
     current_user: dict = Depends(get_current_user),
     sort_by: str = None,
     sort_order: str = 'asc',
-    filter_status: str = None,
-    filter_department: str = None
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
 ):
-    query = {}
-    if filter_status:
-        query['status'] = filter_status
-    if filter_department:
-        query['department'] = filter_department
-    
-    employees = await db.employees.find(query, {"_id": 0}).to_list(1000)
-    
-    # Sorting
-    if sort_by:
-        reverse = sort_order == 'desc'
-        employees.sort(key=lambda x: x.get(sort_by, ''), reverse=reverse)
-    
-    return employees
+    """List employees; filter with filter_<field>[_from|_to], sort with sort_by=-a or a declared pair a,b"""
+    query, sort = build_list_query('employees', request.query_params, sort_by, sort_order)
+    return await paginate(db.employees, query, sort, limit, after)
 
 @api_router.post("/employees", response_model=Employee)
 async def create_employee(employee_data: EmployeeCreate, current_user: dict = Depends(get_current_user)):
     employee = Employee(**employee_data.model_dump())
+    employee.dob_mmdd = birthday_key(employee.dob)
     
     doc = employee.model_dump()
-    await db.employees.insert_one(doc)
+    async with summary_write('employees'):
+        await db.employees.insert_one(doc)
+        await after_write('employees', after=doc)
     return employee
 
 @api_router.patch("/employees/{employee_id}")
 async def update_employee(employee_id: str, update_data: dict, current_user: dict = Depends(get_current_user)):
-    await db.employees.update_one({"id": employee_id}, {"$set": update_data})
+    if 'dob' in update_data:
+        update_data['dob_mmdd'] = birthday_key(update_data['dob'])
+    
+    async with summary_write('employees'):
+        before = await db.employees.find_one_and_update({"id": employee_id}, {"$set": update_data}, {"_id": 0})
+        if before:
+            await after_write('employees', before, {**before, **update_data})
     return {"message": "Employee updated successfully"}
 
 @api_router.delete("/employees/{employee_id}")
@@ -883,100 +1881,199 @@ async def delete_employee(employee_id: str, current_user: dict = Depends(get_cur
     if current_user['role'] not in ['Admin', 'Director']:
         raise HTTPException(status_code=403, detail="Only Admin and Director can delete employees")
     
-    result = await db.employees.delete_one({"id": employee_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Employee not found")
+    async with summary_write('employees'):
+        deleted = await db.employees.find_one_and_delete({"id": employee_id}, {"_id": 0})
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        await after_write('employees', before=deleted)
     
     return {"message": "Employee deleted successfully"}
 
 @api_router.post("/employees/generate-offer")
 async def generate_offer_letter(request: OfferLetterGenerateRequest):
-    # Calculate CTC
-    gross_annual = request.gross_salary_lpa * 100000
-    ctc_annual = gross_annual + 21600
-    monthly_ctc = ctc_annual / 12
-    monthly_gross = gross_annual / 12
-    
-    # Generate offer letter document
-    doc = Document()
-    
-    # Header
-    header = doc.sections[0].header
-    header_para = header.paragraphs[0]
-    header_para.text = "PIPEROCKET"
-    header_para.style.font.size = Pt(16)
-    header_para.style.font.bold = True
-    
-    # Title
-    title = doc.add_paragraph()
-    title_run = title.add_run('OFFER LETTER')
-    title_run.bold = True
-    title_run.font.size = Pt(18)
-    title.alignment = 1
-    
-    doc.add_paragraph()
-    doc.add_paragraph(f"Date: {request.date}")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"Dear {request.employee_name},")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"We are pleased to offer you the position of {request.position} in the {request.department} department.")
-    doc.add_paragraph()
-    
-    doc.add_paragraph("Compensation Details:")
-    doc.add_paragraph(f"• Gross Annual Salary: INR {gross_annual:,.2f}")
-    doc.add_paragraph(f"• Cost to Company (Annual): INR {ctc_annual:,.2f}")
-    doc.add_paragraph(f"• Monthly CTC: INR {monthly_ctc:,.2f}")
-    doc.add_paragraph(f"• Monthly Gross: INR {monthly_gross:,.2f}")
-    doc.add_paragraph()
-    
-    # Salary breakdown table
-    doc.add_paragraph("Monthly Salary Breakdown:")
-    
-    # Calculate components
-    basic = monthly_gross * 0.50
-    hra = monthly_gross * 0.30
-    special = monthly_gross * 0.20
-    
-    doc.add_paragraph(f"• Basic Salary: INR {basic:,.2f}")
-    doc.add_paragraph(f"• HRA: INR {hra:,.2f}")
-    doc.add_paragraph(f"• Special Allowance: INR {special:,.2f}")
-    doc.add_paragraph(f"• Employer PF Contribution: INR 1,800.00")
-    doc.add_paragraph()
-    
-    doc.add_paragraph(f"Please sign and return this offer letter before {request.sign_before_date}.")
-    doc.add_paragraph()
-    
-    doc.add_paragraph("We look forward to welcoming you to our team!")
-    doc.add_paragraph()
-    doc.add_paragraph("Sincerely,")
-    doc.add_paragraph("Piperocket HR Team")
-    doc.add_paragraph()
-    doc.add_paragraph()
-    
-    doc.add_paragraph("Employee Acceptance:")
-    doc.add_paragraph()
-    doc.add_paragraph(f"Name: {request.employee_name}")
-    doc.add_paragraph(f"Date: ________________")
-    doc.add_paragraph(f"Signature: ________________")
-    
-    bio = BytesIO()
-    doc.save(bio)
-    bio.seek(0)
-    
-    return Response(
-        content=bio.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        headers={'Content-Disposition': f'attachment; filename="Offer_{request.employee_name.replace(" ", "_")}.docx"'}
+    filename = f"Offer_{request.employee_name.replace(' ', '_')}.docx"
+    key, content = await cached_document(render_offer_letter, request.model_dump(), filename)
+    return docx_response(content, filename, key)
+
+# ============= DOCUMENT ROUTES =============
+
+def sla_data(client: dict) -> dict:
+    return SLAGenerateRequest(
+        client_name=client['client_name'],
+        address=client['address'],
+        start_date=client['start_date'],
+        tenure_months=client['tenure_months'],
+        currency_preference=client['currency_preference'],
+        service=client['service'],
+        amount_ppc=client.get('amount_ppc'),
+        amount_seo=client.get('amount_seo'),
+        amount=client['amount_inr'],
+        authorised_signatory=client['authorised_signatory'],
+        designation=client['signatory_designation'],
+    ).model_dump()
+
+def nda_data(client: dict) -> dict:
+    return NDAGenerateRequest(
+        client_name=client['client_name'],
+        address=client['address'],
+        start_date=client['start_date'],
+        authorised_signatory=client['authorised_signatory'],
+        designation=client['signatory_designation'],
+    ).model_dump()
+
+def ica_data(contractor: dict) -> dict:
+    address = [contractor.get(key) for key in ('address_1', 'address_2', 'city', 'pincode')]
+    return ICAGenerateRequest(
+        contractor_name=contractor['name'],
+        address=', '.join(part for part in address if part),
+        start_date=contractor['start_date'],
+        tenure_months=contractor['tenure_months'],
+        amount_inr=contractor['monthly_retainer_inr'],
+        designation=contractor['designation'],
+    ).model_dump()
+
+def offer_letter_data(employee: dict) -> dict:
+    # Employees have no designation field, so the department doubles as the position
+    return OfferLetterGenerateRequest(
+        employee_name=f"{employee['first_name']} {employee['last_name']}",
+        date=current_date().isoformat(),
+        gross_salary_lpa=round(employee['monthly_gross_inr'] * 12 / 100000, 2),
+        sign_before_date=employee['doj'],
+        position=employee['department'],
+        department=employee['department'],
+    ).model_dump()
+
+# Document type -> (source collection, file prefix, render data -> name field, record -> render data, renderer)
+RECORD_DOCUMENTS = {
+    'sla': ('clients', 'SLA', 'client_name', sla_data, render_sla),
+    'nda': ('clients', 'NDA', 'client_name', nda_data, render_nda),
+    'ica': ('contractors', 'ICA', 'contractor_name', ica_data, render_ica),
+    'offer_letter': ('employees', 'Offer', 'employee_name', offer_letter_data, render_offer_letter),
+}
+# The agreement an approval signs off, per approval item type
+APPROVAL_DOCUMENTS = {'client': 'sla', 'contractor': 'ica', 'employee': 'offer_letter'}
+
+async def render_batch_entry(slots: asyncio.Semaphore, filename: str, renderer, data: dict) -> tuple:
+    async with slots:
+        try:
+            _, content = await cached_document(renderer, data, filename, wait=True)
+            return filename, content, None
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            return filename, None, f"{filename}: {detail}"
+
+async def stream_document_batch(entries: list, errors: list):
+    """Render entries in parallel and write each into the ZIP as it finishes, draining the archive as it grows"""
+    sink = ChunkSink()
+    # DOCX files are already deflated, so entries are stored as-is
+    archive = zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED)
+    # At most one render per worker, so a batch never fills the queue interactive requests rely on
+    slots = asyncio.Semaphore(DOCUMENT_WORKERS)
+    tasks = [asyncio.create_task(render_batch_entry(slots, *entry)) for entry in entries]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            filename, content, error = await finished
+            if error:
+                errors.append(error)
+                continue
+            archive.writestr(filename, content)
+            yield sink.drain()
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+        archive.close()
+        yield sink.drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def filter_applies(collection: str, name: str) -> bool:
+    spec = LIST_QUERY_SPECS[collection]
+    field, _, bound = name.rpartition('_')
+    return name in spec['filters'] or (bound in ('from', 'to') and field in spec['ranges'])
+
+def batch_queries(request: DocumentBatchRequest) -> tuple:
+    """Query per requested document type, and notes on types skipped because no filter field applies to them"""
+    document_types = list(dict.fromkeys(request.document_types))
+    collections = {document_type: RECORD_DOCUMENTS[document_type][0] for document_type in document_types}
+    unknown = [name for name in request.filter if not any(filter_applies(c, name) for c in collections.values())]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unsupported filter for {', '.join(document_types)}: {', '.join(unknown)}")
+    
+    queries, notes = {}, []
+    for document_type, collection in collections.items():
+        params = {f'filter_{name}': str(value) for name, value in request.filter.items() if filter_applies(collection, name)}
+        if request.ids is None and not params:
+            # Without ids an empty filter would select every record
+            notes.append(f"{document_type}: none of the filter fields apply to {collection}, skipped")
+            continue
+        query, _ = build_list_query(collection, params)
+        if request.ids is not None:
+            query['id'] = {'$in': request.ids}
+        queries[document_type] = query
+    return queries, notes
+
+@api_router.post("/documents/batch")
+async def generate_document_batch(request: DocumentBatchRequest, current_user: dict = Depends(get_current_user)):
+    """Render SLA/NDA/ICA/offer letters for stored records by ids or filter, streamed back as a ZIP"""
+    if not request.document_types:
+        raise HTTPException(status_code=400, detail="Pass at least one document type")
+    if request.ids is None and not request.filter:
+        raise HTTPException(status_code=400, detail="Pass ids or a filter")
+    
+    queries, skipped = batch_queries(request)
+    entries, errors = [], []
+    for document_type, query in queries.items():
+        collection, prefix, name_field, to_data, renderer = RECORD_DOCUMENTS[document_type]
+        async for record in db[collection].find(query, {"_id": 0}).sort('id', ASCENDING):
+            if len(entries) + len(errors) >= DOCUMENT_BATCH_MAX:
+                raise HTTPException(status_code=400, detail=f"A batch is limited to {DOCUMENT_BATCH_MAX} documents")
+            try:
+                data = to_data(record)
+            except (KeyError, ValueError) as e:
+                errors.append(f"{prefix} for {record['id']}: record is missing or has invalid fields ({e})")
+                continue
+            name = data[name_field].replace(' ', '_').replace('/', '_')
+            entries.append((f"{prefix}_{name}_{record['id']}.docx", renderer, data))
+    
+    if not entries and not errors:
+        raise HTTPException(status_code=404, detail="No records match the batch")
+    
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+    return StreamingResponse(
+        stream_document_batch(entries, skipped + errors),
+        media_type='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="documents_{stamp}.zip"'}
     )
 
+@api_router.get("/documents/{document_key}")
+async def download_document(document_key: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Download a stored document by its content key"""
+    stored = await db['documents.files'].find_one({"filename": document_key}, {"metadata": 1}, sort=[('uploadDate', DESCENDING)])
+    if not stored:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    filename = (stored.get('metadata') or {}).get('download_name', f'{document_key[:12]}.docx')
+    if etag_matches(request.headers.get('if-none-match'), f'"{document_key}"'):
+        return Response(status_code=304, headers={'ETag': f'"{document_key}"'})
+    
+    content = document_cache.get((document_key,))
+    if content is None:
+        content = await load_stored_document(document_key)
+        if content is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        document_cache.put((document_key,), content)
+    return docx_response(content, filename, document_key)
+
 # ============= APPROVAL ROUTES =============
 
-@api_router.get("/approvals", response_model=List[Approval])
-async def get_approvals(current_user: dict = Depends(get_current_user)):
-    approvals = await db.approvals.find({}, {"_id": 0}).to_list(1000)
-    return approvals
+@api_router.get("/approvals", response_model=Page[Approval])
+async def get_approvals(
+    current_user: dict = Depends(get_current_user),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
+):
+    # Newest requests first
+    return await paginate(db.approvals, {}, [('created_at', -1), ('id', -1)], limit, after)
 
 @api_router.post("/approvals/{item_type}/{item_id}/request")
 async def request_approval(item_type: str, item_id: str, request: ApprovalRequest, current_user: dict = Depends(get_current_user)):
@@ -1015,6 +2112,27 @@ async def approval_action(approval_id: str, action: ApprovalAction, current_user
     
     return {"message": f"Approval {status.lower()} successfully"}
 
+@api_router.post("/approvals/{approval_id}/document")
+async def approval_document(approval_id: str, current_user: dict = Depends(get_current_user)):
+    """Generate (or reuse) the agreement for an approval's record and link it on the approval"""
+    approval = await db.approvals.find_one({"id": approval_id}, {"_id": 0})
+    if not approval:
+        raise HTTPException(status_code=404, detail="Approval not found")
+    
+    collection, prefix, name_field, to_data, renderer = RECORD_DOCUMENTS[APPROVAL_DOCUMENTS[approval['item_type']]]
+    record = await db[collection].find_one({"id": approval['item_id']}, {"_id": 0})
+    if not record:
+        raise HTTPException(status_code=404, detail=f"{approval['item_type'].capitalize()} for this approval not found")
+    try:
+        data = to_data(record)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Record is missing or has invalid fields ({e})")
+    
+    filename = f"{prefix}_{data[name_field].replace(' ', '_')}.docx"
+    key, _ = await cached_document(renderer, data, filename)
+    await db.approvals.update_one({"id": approval_id}, {"$set": {"document_key": key}})
+    return {"document_key": key, "download_url": f"/api/documents/{key}"}
+
 @api_router.delete("/approvals/reset")
 async def reset_approvals(current_user: dict = Depends(get_current_user)):
     """Reset all approval records - accessible by Staff and Admin"""
@@ -1026,605 +2144,1339 @@ async def reset_approvals(current_user: dict = Depends(get_current_user)):
 
 # ============= DASHBOARD ROUTES =============
 
+DEPARTMENTS = ['PPC', 'SEO', 'Content', 'Backlink', 'Business Development', 'Others']
+
+def by_department(groups: list, value_key: str) -> dict:
+    totals = {group['_id']: group for group in groups}
+    return {
+        dept: {"count": totals.get(dept, {}).get('count', 0), value_key: totals.get(dept, {}).get(value_key, 0)}
+        for dept in DEPARTMENTS
+    }
+
+def org_match(org: str) -> dict:
+    # Records written before orgs existed belong to the default org
+    return {"org": {"$in": [org, None]}} if org == DEFAULT_ORG else {"org": org}
+
+async def compute_dashboard_alerts(org: str = DEFAULT_ORG) -> dict:
+    """Date-dependent alerts: expiring/expired agreements and upcoming birthdays"""
+    today = current_date()
+    today_iso = today.isoformat()
+    expiry_cutoff = (today + timedelta(days=30)).isoformat()
+    agreement_fields = {"_id": 0, "name": "$client_name", "end_date": 1, "service": 1}
+    
+    agreements_pipeline = [
+        {"$match": {"client_status": "Active", **org_match(org)}},
+        {"$facet": {
+            "expiring": [
+                {"$match": {"end_date": {"$gte": today_iso, "$lte": expiry_cutoff}}},
+                {"$sort": {"end_date": 1}},
+                {"$project": agreement_fields}
+            ],
+            "expired": [
+                {"$match": {"end_date": {"$gt": "", "$lt": today_iso}}},
+                {"$sort": {"end_date": 1}},
+                {"$project": agreement_fields}
+            ]
+        }}
+    ]
+    
+    agreements, upcoming_birthdays = await asyncio.gather(
+        db.clients.aggregate(agreements_pipeline).to_list(1),
+        find_upcoming_birthdays(today, BIRTHDAY_ALERT_DAYS, org),
+    )
+    facets = agreements[0] if agreements else {"expiring": [], "expired": []}
+    
+    return {
+        "expiring_agreements": facets['expiring'],
+        "expired_agreements": facets['expired'],
+        "upcoming_birthdays": upcoming_birthdays
+    }
+
+async def compute_dashboard_totals(org: str = DEFAULT_ORG) -> dict:
+    """Per-department revenue and cost figures for active records"""
+    def totals_pipeline(status_field: str, dept_field: str, amount_field: str, value_key: str) -> list:
+        return [
+            {"$match": {status_field: "Active", **org_match(org)}},
+            {"$group": {"_id": f"${dept_field}", "count": {"$sum": 1}, value_key: {"$sum": {"$convert": {"input": f"${amount_field}", "to": "double", "onError": 0, "onNull": 0}}}}}
+        ]
+    
+    collections = list(SUMMARY_CONTRIBUTIONS.items())
+    results = await asyncio.gather(*[
+        db[collection].aggregate(totals_pipeline(status_field, dept_field, amount_field, value_key)).to_list(None)
+        for collection, (_, status_field, _, dept_field, amount_field, value_key) in collections
+    ])
+    return {
+        section: by_department(groups, value_key)
+        for (_, (section, _, _, _, _, value_key)), groups in zip(collections, results)
+    }
+
+async def compute_dashboard_summary(org: str = DEFAULT_ORG) -> dict:
+    alerts, totals = await asyncio.gather(compute_dashboard_alerts(org), compute_dashboard_totals(org))
+    return {"alerts": alerts, **totals}
+
+async def rebuild_dashboard_summary(org: str = DEFAULT_ORG) -> dict:
+    """Recompute the summary and store it only if no delta arrived while it was being computed"""
+    for _ in range(DASHBOARD_REBUILD_ATTEMPTS):
+        # A placeholder makes deltas land on a document (and advance its generation) while totals are computed
+        await db.dashboard_summaries.update_one(
+            {"_id": org}, {"$inc": {"generation": 0}, "$setOnInsert": {"building": True}}, upsert=True
+        )
+        generation = (await db.dashboard_summaries.find_one({"_id": org}, {"generation": 1}) or {}).get('generation', 0)
+        summary = await compute_dashboard_summary(org)
+        abandoned = (datetime.now(timezone.utc) - DASHBOARD_PENDING_TIMEOUT).isoformat()
+        result = await db.dashboard_summaries.replace_one(
+            {"_id": org, "generation": generation,
+             "$or": [{"pending": {"$not": {"$gt": 0}}}, {"pending_at": {"$lt": abandoned}}]},
+            {**summary, "generation": generation, "pending": 0, "alerts_stale": False,
+             "alerts_refreshed_at": datetime.now(timezone.utc).isoformat()}
+        )
+        if result.matched_count:
+            break
+    # Still racing writes: serve the fresh figures and leave the stored summary to the next read
+    return summary
+
+def alerts_expired(summary: dict) -> bool:
+    if summary.get('alerts_stale', True) or not summary.get('alerts_refreshed_at'):
+        return True
+    refreshed_at = datetime.fromisoformat(summary['alerts_refreshed_at'])
+    now = datetime.now(timezone.utc)
+    # Alerts are relative to today, so they also expire at (local) midnight
+    return now - refreshed_at > DASHBOARD_ALERTS_TTL or current_date() != refreshed_at.astimezone().date()
+
 @api_router.get("/dashboard/summary")
 async def get_dashboard_summary(current_user: dict = Depends(get_current_user)):
-    # Get alerts
-    today = datetime.now(timezone.utc)
-    thirty_days_later = today + timedelta(days=30)
-    
-    # Expiring agreements - get actual client names
-    clients_all = await db.clients.find({"client_status": "Active"}).to_list(1000)
-    expiring_clients = []
-    for client in clients_all:
-        if client.get('end_date'):
-            try:
-                end_date = datetime.fromisoformat(client['end_date'])
-                # Remove timezone for comparison
-                if hasattr(end_date, 'date'):
-                    end_date_only = end_date.date()
-                else:
-                    end_date_only = end_date
-                
-                if today.date() <= end_date_only <= thirty_days_later.date():
-                    expiring_clients.append({
-                        "name": client['client_name'],
-                        "end_date": client['end_date'],
-                        "service": client['service']
-                    })
-            except:
-                pass
-    
-    # Upcoming birthdays - get employee and contractor names
-    employees = await db.employees.find({"status": "Active"}).to_list(1000)
-    contractors = await db.contractors.find({"status": "Active"}).to_list(1000)
-    
-    upcoming_birthdays = []
-    
-    for emp in employees:
-        if emp.get('dob'):
-            try:
-                dob = datetime.fromisoformat(emp['dob'])
-                # Calculate days until birthday this year
-                this_year_bday = datetime(today.year, dob.month, dob.day)
-                if this_year_bday < datetime.now():
-                    # Birthday already passed this year, check next year
-                    this_year_bday = datetime(today.year + 1, dob.month, dob.day)
-                
-                days_until = (this_year_bday - datetime.now()).days
-                if 0 <= days_until <= 15:
-                    upcoming_birthdays.append({
-                        "name": f"{emp['first_name']} {emp['last_name']}",
-                        "date": emp['dob'],
-                        "type": "Employee",
-                        "department": emp.get('department', '')
-                    })
-            except:
-                pass
-    
-    for con in contractors:
-        if con.get('dob'):
-            try:
-                dob = datetime.fromisoformat(con['dob'])
-                this_year_bday = datetime(today.year, dob.month, dob.day)
-                if this_year_bday < datetime.now():
-                    this_year_bday = datetime(today.year + 1, dob.month, dob.day)
-                
-                days_until = (this_year_bday - datetime.now()).days
-                if 0 <= days_until <= 15:
-                    upcoming_birthdays.append({
-                        "name": con['name'],
-                        "date": con['dob'],
-                        "type": "Contractor",
-                        "department": con.get('department', '')
-                    })
-            except:
-                pass
-    
-    # Sort birthdays by date
-    upcoming_birthdays.sort(key=lambda x: datetime.fromisoformat(x['date']))
-    
-    # Expired agreements
-    expired_clients = []
-    for client in clients_all:
-        if client.get('end_date'):
-            try:
-                end_date = datetime.fromisoformat(client['end_date'])
-                if hasattr(end_date, 'date'):
-                    end_date_only = end_date.date()
-                else:
-                    end_date_only = end_date
-                
-                if end_date_only < today.date():
-                    expired_clients.append({
-                        "name": client['client_name'],
-                        "end_date": client['end_date'],
-                        "service": client['service']
-                    })
-            except:
-                pass
-    
-    # Revenue metrics
-    clients = await db.clients.find({"client_status": "Active"}).to_list(1000)
-    revenue_by_dept = {}
-    for dept in ['PPC', 'SEO', 'Content', 'Backlink', 'Business Development', 'Others']:
-        dept_clients = [c for c in clients if c.get('service') == dept]
-        count = len(dept_clients)
-        amount = sum(c.get('amount_inr', 0) for c in dept_clients)
-        revenue_by_dept[dept] = {"count": count, "amount": amount}
-    
-    # Employee metrics
-    employee_by_dept = {}
-    for dept in ['PPC', 'SEO', 'Content', 'Backlink', 'Business Development', 'Others']:
-        dept_employees = [e for e in employees if e.get('department') == dept]
-        count = len(dept_employees)
-        cost = sum(e.get('monthly_gross_inr', 0) for e in dept_employees)
-        employee_by_dept[dept] = {"count": count, "cost": cost}
-    
-    # Contractor metrics
-    contractor_by_dept = {}
-    for dept in ['PPC', 'SEO', 'Content', 'Backlink', 'Business Development', 'Others']:
-        dept_contractors = [c for c in contractors if c.get('department') == dept]
-        count = len(dept_contractors)
-        cost = sum(c.get('monthly_retainer_inr', 0) for c in dept_contractors)
-        contractor_by_dept[dept] = {"count": count, "cost": cost}
+    summary = await db.dashboard_summaries.find_one({"_id": DEFAULT_ORG})
+    if not summary or summary.get('building'):
+        return await rebuild_dashboard_summary(DEFAULT_ORG)
+    
+    if alerts_expired(summary):
+        refreshed_at = datetime.now(timezone.utc).isoformat()
+        summary['alerts'] = await compute_dashboard_alerts(DEFAULT_ORG)
+        await db.dashboard_summaries.update_one(
+            {"_id": DEFAULT_ORG},
+            {"$set": {"alerts": summary['alerts'], "alerts_stale": False, "alerts_refreshed_at": refreshed_at}}
+        )
     
     return {
-        "alerts": {
-            "expiring_agreements": expiring_clients,
-            "expired_agreements": expired_clients,
-            "upcoming_birthdays": upcoming_birthdays
-        },
-        "revenue": revenue_by_dept,
-        "employees": employee_by_dept,
-        "contractors": contractor_by_dept
+        "alerts": summary['alerts'],
+        "revenue": summary['revenue'],
+        "employees": summary['employees'],
+        "contractors": summary['contractors']
     }
 
-# ============= BULK EXPORT/IMPORT ROUTES =============
+@api_router.post("/dashboard/summary/rebuild")
+async def rebuild_dashboard(current_user: dict = Depends(get_current_user)):
+    """Recompute the materialized dashboard summary from scratch - Admin only"""
+    if current_user['role'] != 'Admin':
+        raise HTTPException(status_code=403, detail="Only Admin can rebuild the dashboard")
+    return await rebuild_dashboard_summary(DEFAULT_ORG)
 
-@api_router.get("/clients/export")
-async def export_clients(current_user: dict = Depends(get_current_user)):
-    """Export all clients to Excel"""
-    clients = await db.clients.find({}, {"_id": 0}).to_list(1000)
-    
-    if not clients:
-        raise HTTPException(status_code=404, detail="No clients to export")
-    
-    df = pd.DataFrame(clients)
+# ============= REPORT ROUTES =============
+
+def iter_chunks(data: bytes, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+def dataframe_to_xlsx(df: pd.DataFrame, sheet_name: str) -> bytes:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_name)
+    ws.append(list(df.columns))
+    for row in df.itertuples(index=False, name=None):
+        ws.append(list(row))
     output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Clients')
-    
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="clients_export.xlsx"'}
+    wb.save(output)
+    return output.getvalue()
+
+def selected_columns(available: list, columns: Optional[str]) -> list:
+    """Comma-separated column selection, in the order requested; all columns when not given"""
+    if not columns:
+        return available
+    selected = [column.strip() for column in columns.split(',') if column.strip()]
+    unknown = [column for column in selected if column not in available]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return selected
+
+def encode_dataframe(df: pd.DataFrame, export_format: str, sheet_name: str) -> bytes:
+    if export_format == 'xlsx':
+        return dataframe_to_xlsx(df, sheet_name)
+    if export_format == 'csv':
+        return df.to_csv(index=False).encode('utf-8')
+    if export_format == 'ndjson':
+        return df.to_json(orient='records', lines=True).encode('utf-8')
+    output = BytesIO()
+    df.to_parquet(output, index=False)
+    return output.getvalue()
+
+async def report_response(df: pd.DataFrame, export_format: str, sheet_name: str, filename: str, columns: str = None):
+    df = df[selected_columns(list(df.columns), columns)]
+    if export_format == 'json':
+        return json.loads(df.to_json(orient='records'))
+    content = await run_in_threadpool(encode_dataframe, df, export_format, sheet_name)
+    return StreamingResponse(
+        iter_chunks(content),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'}
     )
 
-@api_router.get("/contractors/export")
-async def export_contractors(current_user: dict = Depends(get_current_user)):
-    """Export all contractors to Excel"""
-    contractors = await db.contractors.find({}, {"_id": 0}).to_list(1000)
-    
-    if not contractors:
-        raise HTTPException(status_code=404, detail="No contractors to export")
-    
-    df = pd.DataFrame(contractors)
-    output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Contractors')
-    
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="contractors_export.xlsx"'}
+async def load_report_data() -> tuple:
+    """Active clients, employees and contractors, projected to the fields reports need"""
+    return await asyncio.gather(
+        db.clients.find({"client_status": "Active"}, {"_id": 0, "id": 1, "client_name": 1, "service": 1, "amount_inr": 1}).to_list(None),
+        db.employees.find({"status": "Active"}, {"_id": 0, "id": 1, "first_name": 1, "last_name": 1, "department": 1, "monthly_gross_inr": 1, "projects": 1}).to_list(None),
+        db.contractors.find({"status": "Active"}, {"_id": 0, "id": 1, "name": 1, "department": 1, "monthly_retainer_inr": 1, "projects": 1}).to_list(None),
     )
 
-@api_router.get("/employees/export")
-async def export_employees(current_user: dict = Depends(get_current_user)):
-    """Export all employees to Excel"""
-    employees = await db.employees.find({}, {"_id": 0}).to_list(1000)
-    
-    if not employees:
-        raise HTTPException(status_code=404, detail="No employees to export")
+def client_frame(clients: list) -> pd.DataFrame:
+    df = pd.DataFrame(clients, columns=['id', 'client_name', 'service', 'amount_inr'])
+    df['amount_inr'] = pd.to_numeric(df['amount_inr'], errors='coerce').fillna(0.0)
+    return df
+
+def resource_frame(employees: list, contractors: list) -> pd.DataFrame:
+    """Employees and contractors as one frame with a uniform monthly `cost` column"""
+    emp = pd.DataFrame(employees, columns=['id', 'first_name', 'last_name', 'department', 'monthly_gross_inr', 'projects'])
+    con = pd.DataFrame(contractors, columns=['id', 'name', 'department', 'monthly_retainer_inr', 'projects'])
+    resources = pd.concat([
+        pd.DataFrame({
+            'id': emp['id'],
+            'name': emp['first_name'].fillna('') + ' ' + emp['last_name'].fillna(''),
+            'type': 'Employee',
+            'department': emp['department'],
+            'cost': pd.to_numeric(emp['monthly_gross_inr'], errors='coerce'),
+            'projects': emp['projects'],
+        }),
+        pd.DataFrame({
+            'id': con['id'],
+            'name': con['name'],
+            'type': 'Contractor',
+            'department': con['department'],
+            'cost': pd.to_numeric(con['monthly_retainer_inr'], errors='coerce'),
+            'projects': con['projects'],
+        }),
+    ], ignore_index=True)
+    resources['cost'] = resources['cost'].fillna(0.0)
+    resources['projects'] = [p if isinstance(p, list) else [] for p in resources['projects']]
+    return resources
+
+def allocate_costs(resources: pd.DataFrame) -> pd.DataFrame:
+    """One row per (resource, client) with each resource's cost split evenly across its projects"""
+    project_count = resources['projects'].map(len)
+    assigned = resources[project_count > 0].assign(share=resources['cost'] / project_count)
+    allocations = assigned.explode('projects').rename(columns={'projects': 'client_id'})
+    return allocations[['id', 'type', 'client_id', 'share']]
+
+def cost_by_type(df: pd.DataFrame, index: str, values: str) -> pd.DataFrame:
+    return df.pivot_table(index=index, columns='type', values=values, aggfunc='sum', fill_value=0.0) \
+        .reindex(columns=['Employee', 'Contractor'], fill_value=0.0)
+
+def with_profit(report: pd.DataFrame) -> pd.DataFrame:
+    report['total_cost'] = report['employee_cost'] + report['contractor_cost']
+    report['profit'] = report['revenue'] - report['total_cost']
+    revenue = report['revenue'].to_numpy()
+    report['profit_pct'] = np.round(np.divide(report['profit'].to_numpy() * 100, revenue, out=np.zeros(len(report)), where=revenue != 0), 2)
+    return report
+
+def build_department_pnl(clients: list, employees: list, contractors: list, department: str = None) -> pd.DataFrame:
+    clients_df = client_frame(clients)
+    resources = resource_frame(employees, contractors)
+    departments = [department] if department else DEPARTMENTS
+    
+    revenue = clients_df.groupby('service')['amount_inr'].agg(['sum', 'count'])
+    costs = cost_by_type(resources, 'department', 'cost')
+    
+    report = pd.DataFrame(index=pd.Index(departments, name='department'))
+    report['revenue'] = revenue['sum'].reindex(departments, fill_value=0.0)
+    report['client_count'] = revenue['count'].reindex(departments, fill_value=0).astype(int)
+    report['resource_count'] = resources.groupby('department').size().reindex(departments, fill_value=0).astype(int)
+    report['employee_cost'] = costs['Employee'].reindex(departments, fill_value=0.0)
+    report['contractor_cost'] = costs['Contractor'].reindex(departments, fill_value=0.0)
+    return with_profit(report).reset_index()
+
+def build_client_profitability(clients: list, employees: list, contractors: list, department: str = None) -> pd.DataFrame:
+    clients_df = client_frame(clients)
+    if department:
+        clients_df = clients_df[clients_df['service'] == department]
     
-    df = pd.DataFrame(employees)
-    output = BytesIO()
+    allocations = allocate_costs(resource_frame(employees, contractors))
+    allocations = allocations[allocations['client_id'].isin(clients_df['id'])]
+    costs = cost_by_type(allocations, 'client_id', 'share')
     
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Employees')
+    report = clients_df.rename(columns={'id': 'client_id', 'service': 'department', 'amount_inr': 'revenue'}).set_index('client_id')
+    report['resource_count'] = allocations.groupby('client_id')['id'].nunique().reindex(report.index, fill_value=0).astype(int)
+    report['employee_cost'] = costs['Employee'].reindex(report.index, fill_value=0.0)
+    report['contractor_cost'] = costs['Contractor'].reindex(report.index, fill_value=0.0)
+    return with_profit(report).reset_index().sort_values(['profit', 'client_name'], ascending=[False, True])
+
+@api_router.get("/reports/department-pnl")
+async def get_department_pnl(
+    department: str = None,
+    format: Literal['json', 'xlsx', 'csv', 'ndjson', 'parquet'] = 'json',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Monthly revenue, employee and contractor cost and profit per department"""
+    clients, employees, contractors = await load_report_data()
+    report = await run_in_threadpool(build_department_pnl, clients, employees, contractors, department)
+    return await report_response(report, format, 'Department P&L', 'department_pnl', columns)
+
+@api_router.get("/reports/client-profitability")
+async def get_client_profitability(
+    department: str = None,
+    format: Literal['json', 'xlsx', 'csv', 'ndjson', 'parquet'] = 'json',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Per-client revenue against the share of each assigned resource's cost"""
+    clients, employees, contractors = await load_report_data()
+    report = await run_in_threadpool(build_client_profitability, clients, employees, contractors, department)
+    return await report_response(report, format, 'Client Profitability', 'client_profitability', columns)
+
+@api_router.get("/reports/resource-utilization")
+async def get_resource_utilization(
+    department: str = None,
+    format: Literal['json', 'xlsx', 'csv', 'ndjson', 'parquet'] = 'json',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Per active resource: monthly cost, project count and cost per assigned client"""
+    matrix = await get_allocations()
+    rows = matrix.utilization(department)
+    report = pd.DataFrame(rows, columns=['id', 'name', 'type', 'department', 'monthly_cost', 'project_count', 'per_client_cost'])
+    if format != 'json':
+        return await report_response(report, format, 'Resource Utilization', 'resource_utilization', columns)
+    selected = selected_columns(list(report.columns), columns)
+    return [{column: row[column] for column in selected} for row in sorted(rows, key=lambda r: (r['department'], r['name']))]
+
+@api_router.get("/allocations/clients/{client_id}")
+async def get_client_allocation(client_id: str, current_user: dict = Depends(get_current_user)):
+    """Resources assigned to a client and the share of their cost it carries"""
+    allocation = (await get_allocations()).client_allocation(client_id)
+    if allocation is None:
+        raise HTTPException(status_code=404, detail="Client not found")
+    return allocation
+
+@api_router.get("/allocations/resources/{resource_id}")
+async def get_resource_allocation(resource_id: str, current_user: dict = Depends(get_current_user)):
+    """How an active employee's or contractor's cost is split across their clients"""
+    utilization = (await get_allocations()).resource_utilization(resource_id)
+    if utilization is None:
+        raise HTTPException(status_code=404, detail="Active resource not found")
+    return utilization
+
+# ============= PEOPLE ROUTES =============
+
+BIRTHDAY_ALERT_DAYS = 15
+
+def birthday_on(dob_mmdd: str, year: int) -> date:
+    month, day = int(dob_mmdd[:2]), int(dob_mmdd[2:])
+    # Feb 29 birthdays are celebrated on Feb 28 outside leap years
+    if (month, day) == (2, 29) and not calendar.isleap(year):
+        day = 28
+    return date(year, month, day)
+
+def next_birthday(dob_mmdd: str, today: date) -> date:
+    this_year = birthday_on(dob_mmdd, today.year)
+    return this_year if this_year >= today else birthday_on(dob_mmdd, today.year + 1)
+
+def birthday_ranges(start: date, days: int) -> list:
+    """Inclusive dob_mmdd ranges covering start..start+days, split where the window wraps the year"""
+    if days >= 365:
+        return [('0101', '1231')]
+    end = start + timedelta(days=days)
+    if start.year == end.year:
+        ranges = [(start.strftime('%m%d'), end.strftime('%m%d'))]
+    else:
+        ranges = [(start.strftime('%m%d'), '1231'), ('0101', end.strftime('%m%d'))]
+    
+    # A window ending on Feb 28 of a non-leap year also covers Feb 29 birthdays
+    return [
+        (low, '0229' if high == '0228' and not calendar.isleap(year) else high)
+        for (low, high), year in zip(ranges, (end.year,) if len(ranges) == 1 else (start.year, end.year))
+    ]
+
+async def find_upcoming_birthdays(today: date, days: int, org: str = DEFAULT_ORG) -> list:
+    """Active employees and contractors with a birthday in the next `days` days, soonest first"""
+    match = {
+        "status": "Active",
+        "$or": [{"dob_mmdd": {"$gte": low, "$lte": high}} for low, high in birthday_ranges(today, days)],
+        **org_match(org)
+    }
     
-    output.seek(0)
+    def person_fields(name, person_type: str) -> dict:
+        return {"_id": 0, "id": 1, "name": name, "date": "$dob", "dob_mmdd": 1, "type": person_type, "department": {"$ifNull": ["$department", ""]}}
+    
+    pipeline = [
+        {"$match": match},
+        {"$project": person_fields({"$concat": ["$first_name", " ", "$last_name"]}, "Employee")},
+        {"$unionWith": {"coll": "contractors", "pipeline": [
+            {"$match": match},
+            {"$project": person_fields("$name", "Contractor")}
+        ]}}
+    ]
+    people = await db.employees.aggregate(pipeline).to_list(None)
+    
+    for person in people:
+        upcoming = next_birthday(person.pop('dob_mmdd'), today)
+        person['next_birthday'] = upcoming.isoformat()
+        person['days_until'] = (upcoming - today).days
+    
+    return sorted(people, key=lambda p: (p['days_until'], p['name']))
+
+@api_router.get("/people/birthdays")
+async def get_upcoming_birthdays(
+    days: int = Query(BIRTHDAY_ALERT_DAYS, ge=0, le=366),
+    current_user: dict = Depends(get_current_user)
+):
+    """Active employees and contractors with a birthday between today and `days` days from now"""
+    return await find_upcoming_birthdays(current_date(), days)
+
+# ============= BULK EXPORT/IMPORT ROUTES =============
+
+# Exports follow the model's fields, which leaves out internal ones such as end_date_at
+EXPORT_MODELS = {'clients': Client, 'contractors': Contractor, 'employees': Employee, 'assets': Asset, 'approvals': Approval}
+EXPORT_COLUMNS = {collection: list(model.model_fields) for collection, model in EXPORT_MODELS.items()}
+
+def excel_value(value):
+    """Cell value for a stored field; lists (projects) are joined and other non-scalars written as JSON"""
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+def append_rows(sheet, rows: list):
+    for row in rows:
+        sheet.append(row)
+
+def iter_file(path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
+    """Stream a spooled export from disk, removing it once sent (or abandoned)"""
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+    finally:
+        os.remove(path)
+
+async def iter_export_batches(collection: str, columns: list):
+    """Documents of a collection, projected to `columns`, in lists of EXPORT_BATCH_SIZE"""
+    projection = {"_id": 0, **{column: 1 for column in columns}}
+    batch = []
+    async for doc in db[collection].find({}, projection).batch_size(EXPORT_BATCH_SIZE):
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def save_spooled_workbook(workbook) -> str:
+    with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as spool:
+        workbook.save(spool)
+    return spool.name
+
+async def write_xlsx_export(collection: str, sheet_name: str, columns: list) -> str:
+    """Feed the collection from an async cursor into a write-only workbook spooled to a temp file"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(columns)
+    
+    async for docs in iter_export_batches(collection, columns):
+        rows = [[excel_value(doc.get(column)) for column in columns] for doc in docs]
+        await run_in_threadpool(append_rows, sheet, rows)
+    
+    return await run_in_threadpool(save_spooled_workbook, workbook)
+
+def csv_chunk(docs: list, columns: list, header: bool = False) -> bytes:
+    output = StringIO()
+    writer = csv.writer(output)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([excel_value(doc.get(column)) for column in columns] for doc in docs)
+    return output.getvalue().encode('utf-8')
+
+def ndjson_chunk(docs: list, columns: list) -> bytes:
+    return ''.join(json.dumps({column: doc.get(column) for column in columns}, default=str) + '\n' for doc in docs).encode('utf-8')
+
+def arrow_field(name: str, annotation) -> tuple:
+    """Parquet column type for a model field; Literal, EmailStr and anything else unrecognised are strings"""
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if annotation is int:
+        return name, pa.int64()
+    if annotation is float:
+        return name, pa.float64()
+    if get_origin(annotation) is list:
+        return name, pa.list_(pa.string())
+    return name, pa.string()
+
+def arrow_value(value, arrow_type):
+    """Coerce a stored value to its column type; values that don't fit (legacy rows) become null"""
+    if value is None:
+        return None
+    try:
+        if pa.types.is_int64(arrow_type):
+            return int(value)
+        if pa.types.is_float64(arrow_type):
+            return float(value)
+        if pa.types.is_list(arrow_type):
+            return [str(item) for item in value] if isinstance(value, list) else [str(value)]
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+class ChunkSink:
+    """Write-only, unseekable sink for pq.ParquetWriter and zipfile that hands back whatever was written since the last drain"""
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self.position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def parquet_chunk(writer, sink: ChunkSink, docs: list, schema) -> bytes:
+    """Write one row group and return its bytes"""
+    columns = {field.name: [arrow_value(doc.get(field.name), field.type) for doc in docs] for field in schema}
+    writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+    return sink.drain()
+
+def close_parquet(writer, sink: ChunkSink) -> bytes:
+    writer.close()
+    return sink.drain()
+
+async def stream_export(collection: str, export_format: str, columns: list):
+    """Encode the cursor batch by batch, so the first rows are sent while later ones are still being read"""
+    if export_format == 'csv':
+        header = True
+        async for docs in iter_export_batches(collection, columns):
+            yield await run_in_threadpool(csv_chunk, docs, columns, header)
+            header = False
+        if header:
+            yield csv_chunk([], columns, header)
+    elif export_format == 'ndjson':
+        async for docs in iter_export_batches(collection, columns):
+            yield await run_in_threadpool(ndjson_chunk, docs, columns)
+    else:
+        fields = EXPORT_MODELS[collection].model_fields
+        schema = pa.schema([arrow_field(column, fields[column].annotation) for column in columns])
+        sink = ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        async for docs in iter_export_batches(collection, columns):
+            yield await run_in_threadpool(parquet_chunk, writer, sink, docs, schema)
+        yield await run_in_threadpool(close_parquet, writer, sink)
+
+export_cache = ExportCache(EXPORT_CACHE_MAX_BYTES)
+
+def export_etag(key: tuple) -> str:
+    return '"' + hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+async def cache_stream(key: tuple, chunks):
+    """Pass chunks through to the client and keep a copy for the cache if the export completes within bounds"""
+    parts, size = [], 0
+    async for chunk in chunks:
+        if parts is not None:
+            parts.append(chunk)
+            size += len(chunk)
+            if size > export_cache.max_entry_bytes:
+                parts = None
+        yield chunk
+    if parts is not None:
+        export_cache.put(key, b''.join(parts))
+
+def read_spool(path: str) -> bytes:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+async def export_response(
+    collection: str,
+    sheet_name: str,
+    filename: str,
+    export_format: str = 'xlsx',
+    columns: str = None,
+    if_none_match: str = None
+):
+    columns = selected_columns(EXPORT_COLUMNS[collection], columns)
+    key = (collection, export_format, tuple(columns), await collection_version(collection))
+    etag = export_etag(key)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    headers['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    cached = export_cache.get(key)
+    if cached is not None:
+        return StreamingResponse(iter_chunks(cached), media_type=media_type, headers=headers)
+    
+    if not await db[collection].find_one({}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail=f"No {collection} to export")
+    
+    if export_format != 'xlsx':
+        return StreamingResponse(
+            cache_stream(key, stream_export(collection, export_format, columns)),
+            media_type=media_type,
+            headers=headers
+        )
     
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="employees_export.xlsx"'}
+    # A zip container can only be emitted once complete, so rows stream to disk and the file streams out
+    path = await write_xlsx_export(collection, sheet_name, columns)
+    if os.path.getsize(path) > export_cache.max_entry_bytes:
+        return StreamingResponse(iter_file(path), media_type=media_type, headers=headers)
+    content = await run_in_threadpool(read_spool, path)
+    export_cache.put(key, content)
+    return StreamingResponse(iter_chunks(content), media_type=media_type, headers=headers)
+
+# Sheets of the month-end snapshot, after the summary sheet
+SNAPSHOT_SHEETS = [
+    ('clients', 'Clients'),
+    ('contractors', 'Contractors'),
+    ('employees', 'Employees'),
+    ('assets', 'Assets'),
+    ('approvals', 'Approvals'),
+]
+
+async def stream_snapshot_sheet(sheet, collection: str, lock: asyncio.Lock):
+    """Feed a collection into its write-only sheet a batch at a time, so only one batch per sheet is held"""
+    columns = EXPORT_COLUMNS[collection]
+    async for docs in iter_export_batches(collection, columns):
+        rows = [[excel_value(doc.get(column)) for column in columns] for doc in docs]
+        # Each sheet spools to its own file, but they share the workbook's string table
+        async with lock:
+            await run_in_threadpool(append_rows, sheet, rows)
+
+def summary_sheet_rows(summary: dict, generated_at: str) -> list:
+    """Dashboard figures as rows: per-department count and amount for each section, then alert counts"""
+    rows = [['Snapshot generated at', generated_at], [], ['Section', 'Department', 'Count', 'Amount (INR)']]
+    for section, *_, value_key in SUMMARY_CONTRIBUTIONS.values():
+        figures = summary[section]
+        for dept, values in figures.items():
+            rows.append([section.title(), dept, values['count'], values[value_key]])
+        rows.append([section.title(), 'Total', sum(v['count'] for v in figures.values()), sum(v[value_key] for v in figures.values())])
+    alerts = summary['alerts']
+    rows += [
+        [],
+        ['Alert', 'Count'],
+        ['Agreements expiring in 30 days', len(alerts['expiring_agreements'])],
+        ['Expired agreements', len(alerts['expired_agreements'])],
+        [f'Birthdays in the next {BIRTHDAY_ALERT_DAYS} days', len(alerts['upcoming_birthdays'])],
+    ]
+    return rows
+
+@api_router.get("/export/all")
+async def export_all(current_user: dict = Depends(get_current_user)):
+    """Month-end snapshot of every entity plus the dashboard figures in one workbook"""
+    generated_at = datetime.now(timezone.utc)
+    workbook = Workbook(write_only=True)
+    summary_sheet = workbook.create_sheet('Summary')
+    sheets = []
+    for collection, sheet_name in SNAPSHOT_SHEETS:
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(EXPORT_COLUMNS[collection])
+        sheets.append(sheet)
+    
+    # The collections stream concurrently, so the snapshot takes as long as the slowest one
+    lock = asyncio.Lock()
+    summary, *_ = await asyncio.gather(
+        compute_dashboard_summary(DEFAULT_ORG),
+        *[stream_snapshot_sheet(sheet, collection, lock) for sheet, (collection, _) in zip(sheets, SNAPSHOT_SHEETS)]
+    )
+    append_rows(summary_sheet, summary_sheet_rows(summary, generated_at.isoformat()))
+    path = await run_in_threadpool(save_spooled_workbook, workbook)
+    return StreamingResponse(
+        iter_file(path),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={'Content-Disposition': f'attachment; filename="snapshot_{generated_at.date().isoformat()}.xlsx"'}
     )
 
-@api_router.get("/clients/sample")
-async def get_client_sample(current_user: dict = Depends(get_current_user)):
-    """Download sample Excel template for bulk upload"""
+@api_router.get("/clients/export")
+async def export_clients(
+    request: Request,
+    format: Literal['xlsx', 'csv', 'ndjson', 'parquet'] = 'xlsx',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export all clients as Excel, CSV, NDJSON or Parquet, optionally limited to comma-separated `columns`"""
+    return await export_response('clients', 'Clients', 'clients_export', format, columns, request.headers.get('if-none-match'))
+
+@api_router.get("/contractors/export")
+async def export_contractors(
+    request: Request,
+    format: Literal['xlsx', 'csv', 'ndjson', 'parquet'] = 'xlsx',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export all contractors as Excel, CSV, NDJSON or Parquet, optionally limited to comma-separated `columns`"""
+    return await export_response('contractors', 'Contractors', 'contractors_export', format, columns, request.headers.get('if-none-match'))
+
+@api_router.get("/employees/export")
+async def export_employees(
+    request: Request,
+    format: Literal['xlsx', 'csv', 'ndjson', 'parquet'] = 'xlsx',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export all employees as Excel, CSV, NDJSON or Parquet, optionally limited to comma-separated `columns`"""
+    return await export_response('employees', 'Employees', 'employees_export', format, columns, request.headers.get('if-none-match'))
+
+# Example rows for the downloadable templates; blank cells fall back to the field's default on import
+SAMPLE_ROWS = {
+    'clients': [
+        {'client_name': 'ABC Corp', 'address': '123 Main St', 'start_date': '2025-01-01', 'tenure_months': 12,
+         'currency_preference': 'INR', 'service': 'PPC', 'amount_inr': 50000, 'authorised_signatory': 'John Doe',
+         'signatory_designation': 'CEO', 'gst': 'GST123', 'poc_name': 'Jane Smith', 'poc_email': 'jane@abc.com',
+         'poc_designation': 'Manager', 'poc_mobile': '9876543210', 'approver_user_id': 'user_id'},
+        {'client_name': 'XYZ Ltd', 'address': '456 Park Ave', 'start_date': '2025-02-01', 'tenure_months': 6,
+         'currency_preference': 'INR', 'service': 'SEO', 'amount_inr': 75000, 'authorised_signatory': 'Mike Johnson',
+         'signatory_designation': 'Director', 'gst': 'GST456', 'poc_name': 'Sarah Lee', 'poc_email': 'sarah@xyz.com',
+         'poc_designation': 'Lead', 'poc_mobile': '9876543211', 'approver_user_id': 'user_id'},
+    ],
+    'contractors': [
+        {'name': 'John Contractor', 'doj': '2025-01-01', 'start_date': '2025-01-01', 'tenure_months': 6,
+         'dob': '1990-05-15', 'gender': 'Male', 'pan': 'ABCDE1234F', 'aadhar': '123456789012', 'mobile': '9876543210',
+         'personal_email': 'john@email.com', 'bank_name': 'Bank Name', 'account_holder': 'John Contractor',
+         'account_no': '1234567890', 'ifsc': 'BANK0001234', 'address_1': '123 Street', 'pincode': '110001',
+         'city': 'Delhi', 'address_2': 'Near Market', 'department': 'PPC', 'projects': 'client_id_1, client_id_2',
+         'monthly_retainer_inr': 35000, 'designation': 'Consultant', 'approver_user_id': 'user_id'},
+    ],
+    'employees': [
+        {'doj': '2025-01-15', 'work_email': 'john@company.com', 'emp_id': 'EMP001', 'first_name': 'John',
+         'last_name': 'Doe', 'father_name': 'James Doe', 'dob': '1995-03-20', 'gender': 'Male', 'mobile': '9876543210',
+         'personal_email': 'john.personal@email.com', 'pan': 'ABCDE1234F', 'aadhar': '123456789012',
+         'uan': 'UAN123456', 'pf_account_no': 'PF123456', 'bank_name': 'Bank Name', 'account_no': '1234567890',
+         'ifsc': 'BANK0001234', 'branch': 'Main Branch', 'address': '123 Street', 'pincode': '110001', 'city': 'Delhi',
+         'monthly_gross_inr': 60000, 'department': 'PPC', 'projects': 'client_id_1', 'approver_user_id': 'user_id'},
+    ],
+    'assets': [
+        {'asset_type': 'Laptop', 'model': 'Dell XPS 15', 'serial_number': 'SN123456', 'purchase_date': '2024-01-15',
+         'vendor': 'Dell India', 'value_ex_gst': 75000, 'warranty_period_months': 12, 'alloted_to': 'John Doe',
+         'email': 'john@company.com', 'department': 'PPC'},
+        {'asset_type': 'Monitor', 'model': 'LG 27inch', 'serial_number': 'SN789012', 'purchase_date': '2024-02-01',
+         'vendor': 'LG Store', 'value_ex_gst': 15000, 'warranty_period_months': 24, 'alloted_to': 'Jane Smith',
+         'email': 'jane@company.com', 'department': 'SEO'},
+    ],
+}
+SAMPLE_SHEETS = {'clients': ('Clients', 'client'), 'contractors': ('Contractors', 'contractor'),
+                 'employees': ('Employees', 'employee'), 'assets': ('Assets', 'asset')}
+
+# collection -> (xlsx bytes, ETag), built once at startup
+sample_workbooks = {}
+
+def build_sample_workbook(collection: str) -> bytes:
+    """Template whose header row is the import columns, i.e. the *Create model's fields"""
     wb = Workbook()
     ws = wb.active
-    ws.title = "Clients"
+    ws.title = SAMPLE_SHEETS[collection][0]
     
     # Headers with bold formatting
-    headers = ['client_name', 'address', 'start_date', 'tenure_months', 'currency_preference', 
-               'service', 'amount_inr', 'authorised_signatory', 'signatory_designation', 
-               'gst', 'poc_name', 'poc_email', 'poc_designation', 'poc_mobile', 'approver_user_id']
-    
+    headers = IMPORT_SPECS[collection]['columns']
     for col, header in enumerate(headers, 1):
         cell = ws.cell(row=1, column=col, value=header)
         cell.font = Font(bold=True)
         cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
     
-    # Sample rows
-    ws.append(['ABC Corp', '123 Main St', '2025-01-01', 12, 'INR', 'PPC', 50000, 
-               'John Doe', 'CEO', 'GST123', 'Jane Smith', 'jane@abc.com', 'Manager', '9876543210', 'user_id'])
-    ws.append(['XYZ Ltd', '456 Park Ave', '2025-02-01', 6, 'INR', 'SEO', 75000, 
-               'Mike Johnson', 'Director', 'GST456', 'Sarah Lee', 'sarah@xyz.com', 'Lead', '9876543211', 'user_id'])
+    for example in SAMPLE_ROWS[collection]:
+        ws.append([example.get(header) for header in headers])
     
     output = BytesIO()
     wb.save(output)
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="client_sample.xlsx"'}
-    )
+    return output.getvalue()
+
+def build_sample_workbooks():
+    for collection in SAMPLE_SHEETS:
+        content = build_sample_workbook(collection)
+        sample_workbooks[collection] = (content, '"' + hashlib.sha256(content).hexdigest()[:32] + '"')
+
+def sample_response(collection: str, if_none_match: Optional[str]) -> Response:
+    if collection not in sample_workbooks:
+        build_sample_workbooks()
+    content, etag = sample_workbooks[collection]
+    headers = {'ETag': etag, 'Cache-Control': 'private, max-age=86400'}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    headers['Content-Disposition'] = f'attachment; filename="{SAMPLE_SHEETS[collection][1]}_sample.xlsx"'
+    return Response(content=content, media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+@api_router.get("/clients/sample")
+async def get_client_sample(request: Request, current_user: dict = Depends(get_current_user)):
+    """Download sample Excel template for bulk upload"""
+    return sample_response('clients', request.headers.get('if-none-match'))
 
 @api_router.get("/contractors/sample")
-async def get_contractor_sample(current_user: dict = Depends(get_current_user)):
+async def get_contractor_sample(request: Request, current_user: dict = Depends(get_current_user)):
     """Download sample Excel template for bulk upload"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Contractors"
-    
-    headers = ['name', 'doj', 'start_date', 'tenure_months', 'dob', 'pan', 'aadhar', 
-               'mobile', 'personal_email', 'bank_name', 'account_holder', 'account_no', 
-               'ifsc', 'address_1', 'pincode', 'city', 'address_2', 'department', 
-               'monthly_retainer_inr', 'designation', 'approver_user_id']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-    
-    ws.append(['John Contractor', '2025-01-01', '2025-01-01', 6, '1990-05-15', 'ABCDE1234F', 
-               '123456789012', '9876543210', 'john@email.com', 'Bank Name', 'John Contractor', 
-               '1234567890', 'BANK0001234', '123 Street', '110001', 'Delhi', 'Near Market', 
-               'PPC', 35000, 'Consultant', 'user_id'])
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="contractor_sample.xlsx"'}
-    )
+    return sample_response('contractors', request.headers.get('if-none-match'))
 
 @api_router.get("/employees/sample")
-async def get_employee_sample(current_user: dict = Depends(get_current_user)):
+async def get_employee_sample(request: Request, current_user: dict = Depends(get_current_user)):
     """Download sample Excel template for bulk upload"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Employees"
-    
-    headers = ['doj', 'work_email', 'emp_id', 'first_name', 'last_name', 'father_name', 
-               'dob', 'mobile', 'personal_email', 'pan', 'aadhar', 'uan', 'pf_account_no', 
-               'bank_name', 'account_no', 'ifsc', 'branch', 'address', 'pincode', 'city', 
-               'monthly_gross_inr', 'department', 'approver_user_id']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-    
-    ws.append(['2025-01-15', 'john@company.com', 'EMP001', 'John', 'Doe', 'James Doe', 
-               '1995-03-20', '9876543210', 'john.personal@email.com', 'ABCDE1234F', 
-               '123456789012', 'UAN123456', 'PF123456', 'Bank Name', '1234567890', 
-               'BANK0001234', 'Main Branch', '123 Street', '110001', 'Delhi', 
-               60000, 'PPC', 'user_id'])
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="employee_sample.xlsx"'}
-    )
+    return sample_response('employees', request.headers.get('if-none-match'))
 
 @api_router.get("/assets/sample")
-async def get_asset_sample(current_user: dict = Depends(get_current_user)):
+async def get_asset_sample(request: Request, current_user: dict = Depends(get_current_user)):
     """Download sample Excel template for bulk upload"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Assets"
-    
-    headers = ['asset_type', 'model', 'serial_number', 'purchase_date', 'vendor', 
-               'value_ex_gst', 'warranty_period_months', 'alloted_to', 'email', 'department']
-    
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="CCE5FF", end_color="CCE5FF", fill_type="solid")
-    
-    ws.append(['Laptop', 'Dell XPS 15', 'SN123456', '2024-01-15', 'Dell India', 
-               75000, 12, 'John Doe', 'john@company.com', 'PPC'])
-    ws.append(['Monitor', 'LG 27inch', 'SN789012', '2024-02-01', 'LG Store', 
-               15000, 24, 'Jane Smith', 'jane@company.com', 'SEO'])
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="asset_sample.xlsx"'}
-    )
+    return sample_response('assets', request.headers.get('if-none-match'))
 
-@api_router.post("/clients/import")
-async def import_clients(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Bulk import clients from Excel"""
-    if current_user['role'] not in ['Admin', 'Director']:
-        raise HTTPException(status_code=403, detail="Only Admin and Director can bulk upload")
-    
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
-    
-    try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        imported_count = 0
-        errors = []
+def import_spec(create, model, dates: list, patterns: dict = None, defaults: dict = None) -> dict:
+    """Import columns are the *Create model's fields; optional ones may be left out or blank"""
+    fields = create.model_fields
+    return {
+        'create': create,
+        'model': model,
+        'columns': list(fields),
+        'required': [name for name, field in fields.items() if field.is_required()],
+        'defaults': {
+            **{name: field.get_default(call_default_factory=True) for name, field in fields.items() if not field.is_required()},
+            **(defaults or {}),
+        },
+        'dates': dates,
+        'patterns': patterns or {},
+    }
+
+IMPORT_SPECS = {
+    'clients': import_spec(ClientCreate, Client, dates=['start_date']),
+    'contractors': import_spec(ContractorCreate, Contractor, dates=['doj', 'start_date', 'dob'],
+                               patterns={'pan': PAN_PATTERN, 'ifsc': IFSC_PATTERN}, defaults={'address_2': ''}),
+    'employees': import_spec(EmployeeCreate, Employee, dates=['doj', 'dob'],
+                             patterns={'pan': PAN_PATTERN, 'ifsc': IFSC_PATTERN}),
+    'assets': import_spec(AssetCreate, Asset, dates=['purchase_date']),
+}
+
+def import_kind(annotation) -> str:
+    """How a sheet cell is coerced for a model field: 'int', 'float', 'list' (comma-separated) or 'str'"""
+    if get_origin(annotation) is Union:
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if annotation in (int, float):
+        return annotation.__name__
+    if get_origin(annotation) is list:
+        return 'list'
+    return 'str'
+
+def list_cell(value) -> bool:
+    # NDJSON arrays and Parquet list columns arrive as list/ndarray cells rather than comma-separated text
+    return isinstance(value, (list, tuple, np.ndarray))
+
+def split_list(value) -> list:
+    if list_cell(value):
+        return [str(item) for item in value]
+    return [item.strip() for item in str(value).split(',') if item.strip()]
+
+def cell_value(spec: dict, column: str, row):
+    """Required cells are coerced with str()/int()/float(); blank or missing optional cells take the field default"""
+    if column in spec['required']:
+        value = row[column]
+        if not list_cell(value) and pd.isna(value):
+            raise ValueError(f"{column} is required")
+    else:
+        value = row.get(column)
+        if value is None or (not list_cell(value) and pd.isna(value)):
+            default = spec['defaults'][column]
+            return list(default) if isinstance(default, list) else default
+    
+    kind = import_kind(spec['create'].model_fields[column].annotation)
+    if kind == 'int':
+        # Text cells (CSV) may hold '12.0', as numeric cells may hold 12.0
+        return int(float(value))
+    if kind == 'float':
+        return float(value)
+    if kind == 'list':
+        return split_list(value)
+    return str(value)[:10] if column in spec['dates'] else str(value)
+
+def finish_import_doc(collection: str, doc: dict) -> dict:
+    """Derived fields, as the single-record create routes set them"""
+    if collection in ('clients', 'contractors'):
+        doc['end_date'] = calculate_end_date(doc['start_date'], doc['tenure_months'])
+        doc['agreement_status'] = check_agreement_status(doc['end_date'])
+        doc['end_date_at'] = date_at(doc['end_date'])
+    if collection in ('contractors', 'employees'):
+        doc['dob_mmdd'] = birthday_key(doc['dob'])
+    if collection == 'assets':
+        doc['warranty_end_date'] = calculate_end_date(doc['purchase_date'], doc['warranty_period_months'])
+        doc['warranty_status'] = check_warranty_status(doc['warranty_end_date'])
+        doc['warranty_end_at'] = date_at(doc['warranty_end_date'])
+    return doc
+
+def doc_from_row(collection: str, row) -> dict:
+    """Validate one sheet row through the *Create and entity models; raises with pydantic's message on bad input"""
+    spec = IMPORT_SPECS[collection]
+    data = spec['create'](**{column: cell_value(spec, column, row) for column in spec['columns']})
+    return finish_import_doc(collection, spec['model'](**data.model_dump()).model_dump())
+
+def add_months(dates: pd.Series, months: pd.Series) -> pd.Series:
+    """Vectorized relativedelta(months=n): shift the month and clamp the day to the target month's length"""
+    total = dates.dt.year * 12 + dates.dt.month - 1 + months
+    first = pd.to_datetime(pd.DataFrame({'year': total // 12, 'month': total % 12 + 1, 'day': 1}), errors='coerce')
+    day = np.minimum(dates.dt.day, first.dt.days_in_month)
+    return first + pd.to_timedelta(day - 1, unit='D')
+
+def coerce_import_frame(collection: str, df: pd.DataFrame) -> tuple:
+    """Column-wise coercion and checks; returns (values, suspect mask, pattern errors per row)"""
+    spec = IMPORT_SPECS[collection]
+    fields = spec['create'].model_fields
+    values = pd.DataFrame(index=df.index)
+    suspect = pd.Series(False, index=df.index)
+    pattern_errors = pd.Series('', index=df.index)
+    
+    for column in spec['columns']:
+        optional = column not in spec['required']
+        if column in df.columns:
+            raw = df[column]
+        elif optional:
+            raw = pd.Series(np.nan, index=df.index)
+        else:
+            # The row builder reports the missing column for every row
+            return values, pd.Series(True, index=df.index), pattern_errors
         
-        for index, row in df.iterrows():
-            try:
-                # Create client object
-                client_data = ClientCreate(
-                    client_name=str(row['client_name']),
-                    address=str(row['address']),
-                    start_date=str(row['start_date'])[:10],
-                    tenure_months=int(row['tenure_months']),
-                    currency_preference=str(row.get('currency_preference', 'INR')),
-                    service=str(row['service']),
-                    amount_inr=float(row['amount_inr']),
-                    authorised_signatory=str(row['authorised_signatory']),
-                    signatory_designation=str(row['signatory_designation']),
-                    gst=str(row['gst']),
-                    poc_name=str(row['poc_name']),
-                    poc_email=str(row['poc_email']),
-                    poc_designation=str(row['poc_designation']),
-                    poc_mobile=str(row['poc_mobile']),
-                    approver_user_id=str(row['approver_user_id'])
-                )
-                
-                client = Client(**client_data.model_dump())
-                client.end_date = calculate_end_date(client.start_date, client.tenure_months)
-                client.agreement_status = check_agreement_status(client.end_date)
-                
-                await db.clients.insert_one(client.model_dump())
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
+        annotation = fields[column].annotation
+        kind = import_kind(annotation)
+        if kind in ('int', 'float'):
+            numbers = pd.to_numeric(raw, errors='coerce')
+            # Blank optional cells take the default; anything else that isn't a number needs the slow path
+            suspect |= numbers.isna() & ~(raw.isna() if optional else False)
+            if kind == 'int':
+                suspect |= numbers % 1 != 0
+            values[column] = numbers
+            continue
+        if kind == 'list':
+            values[column] = [split_list(value) if list_cell(value) or pd.notna(value) else [] for value in raw]
+            continue
         
-        return {
-            "message": f"Import completed. {imported_count} clients imported successfully.",
-            "imported": imported_count,
-            "errors": errors if errors else None
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+        text = raw.astype(str)
+        if optional:
+            text = text.where(raw.notna(), spec['defaults'][column])
+        else:
+            # Blank required cells would otherwise become 'nan'; the row builder reports them
+            suspect |= raw.isna()
+        if column in spec['dates']:
+            text = text.str[:10]
+            suspect |= pd.to_datetime(text, format='%Y-%m-%d', errors='coerce').isna()
+        if get_origin(annotation) is Literal:
+            suspect |= ~text.isin(get_args(annotation))
+        elif annotation is EmailStr:
+            suspect |= ~text.str.fullmatch(EMAIL_PATTERN)
+        elif column in spec['patterns']:
+            text = text.str.strip().str.upper()
+            invalid = ~text.str.fullmatch(spec['patterns'][column])
+            pattern_errors = pattern_errors.where(~invalid, pattern_errors + f"invalid {column} " + text.map(repr) + "; ")
+        values[column] = text
+    
+    return values, suspect, pattern_errors
+
+def derive_import_fields(collection: str, values: pd.DataFrame) -> pd.DataFrame:
+    """Vectorized end dates, statuses and birthday keys matching the single-record create routes"""
+    today = pd.Timestamp(current_date())
+    
+    if collection in ('clients', 'contractors'):
+        end = add_months(pd.to_datetime(values['start_date']), values['tenure_months'])
+        values['end_date'] = end.dt.strftime('%Y-%m-%d')
+        values['agreement_status'] = np.where(end >= today, 'Live', 'Expired')
+    if collection in ('contractors', 'employees'):
+        values['dob_mmdd'] = pd.to_datetime(values['dob']).dt.strftime('%m%d')
+    if collection == 'assets':
+        end = add_months(pd.to_datetime(values['purchase_date']), values['warranty_period_months'])
+        values['warranty_end_date'] = end.dt.strftime('%Y-%m-%d')
+        values['warranty_status'] = np.where(end >= today, 'Active', 'Expired')
+    return values
+
+def model_docs(model, records: list):
+    """Yield records as `model` would dump them, filling defaults without re-validating already checked values"""
+    fields = model.model_fields
+    factories = {name: field.default_factory for name, field in fields.items() if field.default_factory}
+    defaults = {name: field.default for name, field in fields.items() if not field.is_required() and name not in factories}
+    for record in records:
+        yield {name: record[name] if name in record else factories[name]() if name in factories else defaults[name]
+               for name in fields}
+
+def validate_import_frame(collection: str, df: pd.DataFrame) -> tuple:
+    """Validate a sheet column-wise; only rows flagged by the vectorized checks go through the pydantic row builder.
+    
+    Returns ([(row_number, doc)], [(row_number, message)]) with spreadsheet row numbers (1-based plus header).
+    """
+    spec = IMPORT_SPECS[collection]
+    values, suspect, pattern_errors = coerce_import_frame(collection, df)
+    row_numbers = df.index + 2
+    docs = []
+    errors = [(row_number, message.rstrip('; '))
+              for row_number, message in zip(row_numbers, pattern_errors) if message]
+    
+    fast = ~suspect & (pattern_errors == '')
+    if fast.any():
+        good = values[fast].copy()
+        for column in spec['columns']:
+            kind = import_kind(spec['create'].model_fields[column].annotation)
+            if kind not in ('int', 'float'):
+                continue
+            if column in spec['required']:
+                good[column] = good[column].astype('int64' if kind == 'int' else 'float64')
+            else:
+                filled = good[column].astype(object)
+                good[column] = filled.where(good[column].notna(), spec['defaults'][column])
+        good = derive_import_fields(collection, good)
+        # Column-wise tolist() yields native Python scalars far faster than to_dict('records')
+        columns = list(good.columns)
+        records = [dict(zip(columns, row)) for row in zip(*(good[column].tolist() for column in columns))]
+        for row_number, record, doc in zip(row_numbers[fast.to_numpy()], records, model_docs(spec['model'], records)):
+            for column, at_column in (('end_date', 'end_date_at'), ('warranty_end_date', 'warranty_end_at')):
+                if column in record:
+                    doc[at_column] = date_at(record[column])
+            docs.append((row_number, doc))
+    
+    fallback = suspect & (pattern_errors == '')
+    for (index, row), row_number in zip(df[fallback].iterrows(), row_numbers[fallback.to_numpy()]):
+        try:
+            doc = doc_from_row(collection, row)
+            for column in spec['patterns']:
+                doc[column] = values.at[index, column]
+            docs.append((row_number, doc))
+        except Exception as e:
+            errors.append((row_number, str(e)))
+    
+    docs.sort(key=lambda item: item[0])
+    return docs, errors
+
+async def insert_import_batch(collection: str, batch: list) -> tuple:
+    """Insert (row_number, doc) pairs in one unordered insert_many; returns inserted docs and row errors"""
+    docs = [doc for _, doc in batch]
+    try:
+        await db[collection].insert_many(docs, ordered=False)
+        return docs, []
+    except BulkWriteError as e:
+        failed = {error['index']: error.get('errmsg', 'write failed') for error in e.details.get('writeErrors', [])}
+        inserted = [doc for index, doc in enumerate(docs) if index not in failed]
+        return inserted, [(batch[index][0], message) for index, message in failed.items()]
+
+async def upsert_import_batch(collection: str, batch: list, sheet_columns: list) -> tuple:
+    """Upsert (row_number, doc) pairs on the natural key in one unordered bulk_write; returns inserted docs, counts and row errors
+    
+    The sheet's columns and the fields derived from them are $set; ids, created_at, workflow defaults
+    (sign status, client/employment status) and optional columns the sheet leaves out (e.g. projects)
+    are only written when the record is new.
+    """
+    keys = IMPORT_NATURAL_KEYS[collection]
+    sheet_fields = set(IMPORT_SPECS[collection]['required']) | set(sheet_columns) | set(IMPORT_DERIVED_FIELDS)
+    rows, operations, errors = [], [], []
+    for row_number, doc in batch:
+        missing = [key for key in keys if doc.get(key) in (None, '', 'nan', 'None')]
+        if missing:
+            errors.append((row_number, f"missing {', '.join(missing)} for upsert"))
+            continue
+        rows.append((row_number, doc))
+        operations.append(UpdateOne(
+            {key: doc[key] for key in keys},
+            {
+                "$set": {field: value for field, value in doc.items() if field in sheet_fields},
+                "$setOnInsert": {field: value for field, value in doc.items() if field not in sheet_fields},
+            },
+            upsert=True
+        ))
+    
+    if not operations:
+        return [], {'imported': 0, 'updated': 0, 'unchanged': 0}, errors
+    try:
+        result = (await db[collection].bulk_write(operations, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        result = e.details
+        errors.extend((rows[error['index']][0], error.get('errmsg', 'write failed')) for error in result.get('writeErrors', []))
+    
+    inserted = [rows[upserted['index']][1] for upserted in result.get('upserted', [])]
+    counts = {
+        'imported': len(inserted),
+        'updated': result.get('nModified', 0),
+        'unchanged': result.get('nMatched', 0) - result.get('nModified', 0),
+    }
+    return inserted, counts, errors
 
-@api_router.post("/contractors/import")
-async def import_contractors(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Bulk import contractors from Excel"""
-    if current_user['role'] not in ['Admin', 'Director']:
-        raise HTTPException(status_code=403, detail="Only Admin and Director can bulk upload")
-    
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
-    
+def sheet_frame(header: list, rows: list, row_numbers: list) -> pd.DataFrame:
+    """Rows read from a sheet as a DataFrame indexed so that index + 2 is the spreadsheet row number"""
+    frame = pd.DataFrame(rows, columns=header, index=[row_number - 2 for row_number in row_numbers])
+    # Empty cells arrive as None; match pd.read_excel, which reads them as NaN
+    return frame.where(frame.notna(), np.nan)
+
+def iter_xlsx_frames(fileobj, chunk_size: int):
+    """Stream an .xlsx through openpyxl's read-only reader, yielding DataFrames of at most chunk_size rows"""
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
     try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in df.iterrows():
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name) if name is not None else f"Unnamed: {position}"
+                  for position, name in enumerate(next(rows, ()))]
+        chunk, row_numbers = [], []
+        for row_number, row in enumerate(rows, start=2):
+            if all(value is None for value in row):
+                continue
+            chunk.append(row[:len(header)])
+            row_numbers.append(row_number)
+            if len(chunk) >= chunk_size:
+                yield sheet_frame(header, chunk, row_numbers)
+                chunk, row_numbers = [], []
+        if chunk:
+            yield sheet_frame(header, chunk, row_numbers)
+    finally:
+        workbook.close()
+
+def iter_parquet_frames(fileobj, chunk_size: int):
+    """Stream a Parquet file by record batches, numbering rows from 1 like NDJSON lines"""
+    offset = -1
+    for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=chunk_size):
+        frame = batch.to_pandas()
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        yield frame
+
+def iter_upload_frames(fileobj, filename: str, chunk_size: int = IMPORT_BATCH_SIZE):
+    """Yield an uploaded file in chunks; .xlsx, .csv, NDJSON and Parquet stream, legacy .xls is read whole"""
+    if filename.endswith('.xlsx'):
+        yield from iter_xlsx_frames(fileobj, chunk_size)
+    elif filename.endswith('.csv'):
+        # read_csv keeps a running index across chunks, so row numbers stay correct. Cells are read as text so
+        # identifiers keep their leading zeros and no chunk guesses a different type; numbers are converted later
+        yield from pd.read_csv(fileobj, chunksize=chunk_size, dtype=str)
+    elif filename.endswith(('.ndjson', '.jsonl')):
+        # Values are taken as written; there is no header line, so shift the index to report line numbers
+        with pd.read_json(fileobj, lines=True, chunksize=chunk_size, dtype=False, convert_dates=False) as reader:
+            for frame in reader:
+                frame.index = frame.index - 1
+                yield frame
+    elif filename.endswith('.parquet'):
+        yield from iter_parquet_frames(fileobj, chunk_size)
+    else:
+        df = pd.read_excel(fileobj)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+async def import_frames(collection: str, frames, mode: str = 'insert', progress=None) -> tuple:
+    """Validate each chunk and write it in batches of IMPORT_BATCH_SIZE as it arrives; returns (counts, errors)
+    
+    counts holds imported (newly inserted), updated and unchanged rows. `progress(rows_processed, counts,
+    error_rows)` is awaited after every chunk when given.
+    """
+    rows_processed = 0
+    counts = {'imported': 0, 'updated': 0, 'unchanged': 0}
+    errors = []
+    
+    async for df in frames:
+        docs, frame_errors = await run_in_threadpool(validate_import_frame, collection, df)
+        errors.extend(frame_errors)
+        for start in range(0, len(docs), IMPORT_BATCH_SIZE):
+            batch = docs[start:start + IMPORT_BATCH_SIZE]
+            async with summary_write(collection):
+                if mode == 'upsert':
+                    inserted, batch_counts, write_errors = await upsert_import_batch(collection, batch, list(df.columns))
+                    if batch_counts['updated']:
+                        await after_bulk_update(collection)
+                else:
+                    inserted, write_errors = await insert_import_batch(collection, batch)
+                    batch_counts = {'imported': len(inserted)}
+                await after_bulk_insert(collection, inserted)
+            for name, value in batch_counts.items():
+                counts[name] += value
+            errors.extend(write_errors)
+        rows_processed += len(df)
+        if progress:
+            await progress(rows_processed, counts, len(errors))
+    
+    return counts, [f"Row {row_number}: {message}" for row_number, message in sorted(errors)]
+
+# Caps how many import jobs parse and write at once; further jobs wait as 'queued'
+import_job_slots = asyncio.Semaphore(IMPORT_JOB_CONCURRENCY)
+
+async def update_import_job(job_id: str, **fields):
+    await db.import_jobs.update_one({"id": job_id}, {"$set": fields})
+
+async def run_import_job(job_id: str, collection: str, path: str, filename: str, mode: str = 'insert'):
+    """Background worker for one upload; records progress and the final counts on the job"""
+    try:
+        async with import_job_slots:
+            started = time.monotonic()
+            await update_import_job(job_id, status='running', started_at=datetime.now(timezone.utc).isoformat())
+            
+            async def progress(rows_processed: int, counts: dict, error_rows: int):
+                elapsed = max(time.monotonic() - started, 1e-6)
+                await update_import_job(
+                    job_id, rows_processed=rows_processed, error_rows=error_rows,
+                    rows_per_sec=round(rows_processed / elapsed, 1), **counts
+                )
+            
             try:
-                contractor_data = ContractorCreate(
-                    name=str(row['name']),
-                    doj=str(row['doj'])[:10],
-                    start_date=str(row['start_date'])[:10],
-                    tenure_months=int(row['tenure_months']),
-                    dob=str(row['dob'])[:10],
-                    pan=str(row['pan']),
-                    aadhar=str(row['aadhar']),
-                    mobile=str(row['mobile']),
-                    personal_email=str(row['personal_email']),
-                    bank_name=str(row['bank_name']),
-                    account_holder=str(row['account_holder']),
-                    account_no=str(row['account_no']),
-                    ifsc=str(row['ifsc']),
-                    address_1=str(row['address_1']),
-                    pincode=str(row['pincode']),
-                    city=str(row['city']),
-                    address_2=str(row.get('address_2', '')),
-                    department=str(row['department']),
-                    monthly_retainer_inr=float(row['monthly_retainer_inr']),
-                    designation=str(row['designation']),
-                    approver_user_id=str(row['approver_user_id'])
+                frames = iterate_in_threadpool(iter_upload_frames(path, filename))
+                counts, errors = await import_frames(collection, frames, mode, progress)
+                if mode == 'upsert':
+                    message = (f"Import completed. {counts['imported']} {collection} inserted, "
+                               f"{counts['updated']} updated, {counts['unchanged']} unchanged.")
+                else:
+                    message = f"Import completed. {counts['imported']} {collection} imported successfully."
+                await update_import_job(
+                    job_id, status='completed', message=message, error_rows=len(errors),
+                    errors=errors[:IMPORT_JOB_ERROR_LIMIT], finished_at=datetime.now(timezone.utc).isoformat(), **counts
                 )
-                
-                contractor = Contractor(**contractor_data.model_dump())
-                contractor.end_date = calculate_end_date(contractor.start_date, contractor.tenure_months)
-                contractor.agreement_status = check_agreement_status(contractor.end_date)
-                
-                await db.contractors.insert_one(contractor.model_dump())
-                imported_count += 1
-                
             except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
-        
-        return {
-            "message": f"Import completed. {imported_count} contractors imported successfully.",
-            "imported": imported_count,
-            "errors": errors if errors else None
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+                logger.error(f"Import job {job_id} failed: {str(e)}")
+                await update_import_job(
+                    job_id, status='failed', message=f"Failed to process file: {str(e)}",
+                    finished_at=datetime.now(timezone.utc).isoformat()
+                )
+    finally:
+        os.remove(path)
 
-@api_router.post("/employees/import")
-async def import_employees(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Bulk import employees from Excel"""
+async def import_upload(collection: str, file: UploadFile, mode: str, background_tasks: BackgroundTasks, current_user: dict) -> dict:
+    """Spool the upload to a file the job owns and queue it; the request returns before any row is parsed"""
     if current_user['role'] not in ['Admin', 'Director']:
         raise HTTPException(status_code=403, detail="Only Admin and Director can bulk upload")
     
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
-    
-    try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                employee_data = EmployeeCreate(
-                    doj=str(row['doj'])[:10],
-                    work_email=str(row['work_email']),
-                    emp_id=str(row['emp_id']),
-                    first_name=str(row['first_name']),
-                    last_name=str(row['last_name']),
-                    father_name=str(row['father_name']),
-                    dob=str(row['dob'])[:10],
-                    mobile=str(row['mobile']),
-                    personal_email=str(row['personal_email']),
-                    pan=str(row['pan']),
-                    aadhar=str(row['aadhar']),
-                    uan=str(row['uan']),
-                    pf_account_no=str(row['pf_account_no']),
-                    bank_name=str(row['bank_name']),
-                    account_no=str(row['account_no']),
-                    ifsc=str(row['ifsc']),
-                    branch=str(row['branch']),
-                    address=str(row['address']),
-                    pincode=str(row['pincode']),
-                    city=str(row['city']),
-                    monthly_gross_inr=float(row['monthly_gross_inr']),
-                    department=str(row['department']),
-                    approver_user_id=str(row['approver_user_id'])
-                )
-                
-                employee = Employee(**employee_data.model_dump())
-                await db.employees.insert_one(employee.model_dump())
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
-        
-        return {
-            "message": f"Import completed. {imported_count} employees imported successfully.",
-            "imported": imported_count,
-            "errors": errors if errors else None
-        }
+    if not file.filename.endswith(IMPORT_EXTENSIONS):
+        raise HTTPException(status_code=400, detail="Only Excel (.xlsx, .xls), CSV, NDJSON and Parquet files are supported")
+    
+    if mode not in IMPORT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(IMPORT_MODES)}")
+    
+    # Starlette closes the upload once the response is sent, so the job gets its own copy
+    with tempfile.NamedTemporaryFile(suffix=Path(file.filename).suffix, delete=False) as spool:
+        await run_in_threadpool(shutil.copyfileobj, file.file, spool)
+    
+    job = {
+        "id": f"job_{uuid.uuid4().hex[:12]}",
+        "collection": collection,
+        "filename": file.filename,
+        "mode": mode,
+        "status": 'queued',
+        "rows_processed": 0,
+        "imported": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "error_rows": 0,
+        "rows_per_sec": 0.0,
+        "errors": [],
+        "created_by": current_user['user_id'],
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    await db.import_jobs.insert_one(job)
+    background_tasks.add_task(run_import_job, job['id'], collection, spool.name, file.filename, mode)
     
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+    return {"job_id": job['id'], "status": job['status'], "message": "Import queued"}
 
-@api_router.post("/assets/import")
-async def import_assets(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    """Bulk import assets from Excel"""
+@api_router.get("/jobs/{job_id}")
+async def get_import_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a bulk import job: rows processed, rows/sec, error rows and, once finished, the final counts"""
     if current_user['role'] not in ['Admin', 'Director']:
-        raise HTTPException(status_code=403, detail="Only Admin and Director can bulk upload")
-    
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="Only Excel files (.xlsx, .xls) are supported")
-    
-    try:
-        contents = await file.read()
-        df = pd.read_excel(BytesIO(contents))
-        
-        imported_count = 0
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                asset_data = AssetCreate(
-                    asset_type=str(row['asset_type']),
-                    model=str(row['model']),
-                    serial_number=str(row['serial_number']),
-                    purchase_date=str(row['purchase_date'])[:10],
-                    vendor=str(row['vendor']),
-                    value_ex_gst=float(row['value_ex_gst']),
-                    warranty_period_months=int(row['warranty_period_months']),
-                    alloted_to=str(row['alloted_to']),
-                    email=str(row['email']),
-                    department=str(row['department'])
-                )
-                
-                asset = Asset(**asset_data.model_dump())
-                
-                # Calculate warranty status
-                purchase_date = datetime.fromisoformat(asset.purchase_date)
-                warranty_end = purchase_date + timedelta(days=asset.warranty_period_months * 30)
-                asset.warranty_status = 'Active' if datetime.now() <= warranty_end else 'Expired'
-                
-                await db.assets.insert_one(asset.model_dump())
-                imported_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
-        
-        return {
-            "message": f"Import completed. {imported_count} assets imported successfully.",
-            "imported": imported_count,
-            "errors": errors if errors else None
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+        raise HTTPException(status_code=403, detail="Only Admin and Director can view import jobs")
+    
+    job = await db.import_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@api_router.post("/clients/import", status_code=202)
+async def import_clients(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    mode: str = 'insert',
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a bulk import of clients from Excel, CSV, NDJSON or Parquet; poll GET /api/jobs/{job_id} for progress"""
+    return await import_upload('clients', file, mode, background_tasks, current_user)
+
+@api_router.post("/contractors/import", status_code=202)
+async def import_contractors(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    mode: str = 'insert',
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a bulk import of contractors from Excel, CSV, NDJSON or Parquet; poll GET /api/jobs/{job_id} for progress"""
+    return await import_upload('contractors', file, mode, background_tasks, current_user)
+
+@api_router.post("/employees/import", status_code=202)
+async def import_employees(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    mode: str = 'insert',
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a bulk import of employees from Excel, CSV, NDJSON or Parquet; poll GET /api/jobs/{job_id} for progress"""
+    return await import_upload('employees', file, mode, background_tasks, current_user)
+
+@api_router.post("/assets/import", status_code=202)
+async def import_assets(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    mode: str = 'insert',
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a bulk import of assets from Excel, CSV, NDJSON or Parquet; poll GET /api/jobs/{job_id} for progress"""
+    return await import_upload('assets', file, mode, background_tasks, current_user)
 
 # ============= ASSET TRACKER ROUTES =============
 
-@api_router.get("/assets", response_model=List[Asset])
+@api_router.get("/assets", response_model=Page[Asset])
 async def get_assets(
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    department: str = None
+    department: str = None,
+    sort_by: str = None,
+    sort_order: str = 'asc',
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None
 ):
-    query = {}
+    query, sort = build_list_query('assets', request.query_params, sort_by, sort_order)
     if department:
         query['department'] = department
     
-    assets = await db.assets.find(query, {"_id": 0}).to_list(1000)
-    
-    # Update warranty status
-    for asset in assets:
-        purchase_date = datetime.fromisoformat(asset['purchase_date'])
-        warranty_end = purchase_date + timedelta(days=asset['warranty_period_months'] * 30)
-        if datetime.now() > warranty_end:
-            asset['warranty_status'] = 'Expired'
-        else:
-            asset['warranty_status'] = 'Active'
-    
-    return assets
+    # warranty_status is kept current by the expiry sweeper
+    return await paginate(db.assets, query, sort, limit, after)
 
 @api_router.post("/assets", response_model=Asset)
 async def create_asset(asset_data: AssetCreate, current_user: dict = Depends(get_current_user)):
     asset = Asset(**asset_data.model_dump())
-    
-    # Calculate warranty status
-    purchase_date = datetime.fromisoformat(asset.purchase_date)
-    warranty_end = purchase_date + timedelta(days=asset.warranty_period_months * 30)
-    asset.warranty_status = 'Active' if datetime.now() <= warranty_end else 'Expired'
+    asset.warranty_end_date = calculate_end_date(asset.purchase_date, asset.warranty_period_months)
+    asset.warranty_status = check_warranty_status(asset.warranty_end_date)
     
     doc = asset.model_dump()
+    doc['warranty_end_at'] = date_at(asset.warranty_end_date)
     await db.assets.insert_one(doc)
+    await after_write('assets', after=doc)
     return asset
 
 @api_router.patch("/assets/{asset_id}")
 async def update_asset(asset_id: str, update_data: dict, current_user: dict = Depends(get_current_user)):
-    await db.assets.update_one({"id": asset_id}, {"$set": update_data})
+    # Recalculate the warranty window if purchase_date or warranty_period_months changed
+    if 'purchase_date' in update_data or 'warranty_period_months' in update_data:
+        asset = await db.assets.find_one({"id": asset_id})
+        if asset:
+            purchase_date = update_data.get('purchase_date', asset.get('purchase_date'))
+            warranty_period_months = update_data.get('warranty_period_months', asset.get('warranty_period_months'))
+            
+            if purchase_date and warranty_period_months is not None:
+                warranty_end_date = calculate_end_date(purchase_date, int(warranty_period_months))
+                update_data['warranty_end_date'] = warranty_end_date
+                update_data['warranty_end_at'] = date_at(warranty_end_date)
+                update_data['warranty_status'] = check_warranty_status(warranty_end_date)
+    
+    before = await db.assets.find_one_and_update({"id": asset_id}, {"$set": update_data}, {"_id": 0})
+    if before:
+        await after_write('assets', before, {**before, **update_data})
     return {"message": "Asset updated successfully"}
 
 @api_router.delete("/assets/{asset_id}")
@@ -1632,33 +3484,88 @@ async def delete_asset(asset_id: str, current_user: dict = Depends(get_current_u
     if current_user['role'] not in ['Admin', 'Director']:
         raise HTTPException(status_code=403, detail="Only Admin and Director can delete assets")
     
-    result = await db.assets.delete_one({"id": asset_id})
-    if result.deleted_count == 0:
+    deleted = await db.assets.find_one_and_delete({"id": asset_id}, {"_id": 0})
+    if not deleted:
         raise HTTPException(status_code=404, detail="Asset not found")
+    await after_write('assets', before=deleted)
     
     return {"message": "Asset deleted successfully"}
 
 @api_router.get("/assets/export")
-async def export_assets(current_user: dict = Depends(get_current_user)):
-    """Export all assets to Excel"""
-    assets = await db.assets.find({}, {"_id": 0}).to_list(1000)
-    
-    if not assets:
-        raise HTTPException(status_code=404, detail="No assets to export")
-    
-    df = pd.DataFrame(assets)
-    output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Assets')
-    
-    output.seek(0)
+async def export_assets(
+    request: Request,
+    format: Literal['xlsx', 'csv', 'ndjson', 'parquet'] = 'xlsx',
+    columns: str = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Export all assets as Excel, CSV, NDJSON or Parquet, optionally limited to comma-separated `columns`"""
+    return await export_response('assets', 'Assets', 'assets_export', format, columns, request.headers.get('if-none-match'))
+
+# ============= BACKGROUND JOBS =============
+
+# Stored statuses kept in step with their native expiry date: collection, date field, status field, live and expired values
+EXPIRY_SWEEPS = [
+    ('clients', 'end_date_at', 'agreement_status', 'Live', 'Expired'),
+    ('contractors', 'end_date_at', 'agreement_status', 'Live', 'Expired'),
+    ('assets', 'warranty_end_at', 'warranty_status', 'Active', 'Expired'),
+]
+
+async def sweep_expiry_statuses() -> dict:
+    """Flip stored statuses whose expiry date has passed (or moved back into the future)"""
+    today = today_at()
+    changed = {}
+    for collection, date_field, status_field, live, expired in EXPIRY_SWEEPS:
+        lapsed = await db[collection].update_many(
+            {status_field: live, date_field: {"$lt": today}},
+            {"$set": {status_field: expired}}
+        )
+        renewed = await db[collection].update_many(
+            {status_field: expired, date_field: {"$gte": today}},
+            {"$set": {status_field: live}}
+        )
+        changed[collection] = lapsed.modified_count + renewed.modified_count
+        if changed[collection]:
+            await bump_version(collection)
+    return changed
+
+async def run_expiry_sweeper():
+    while True:
+        try:
+            changed = await sweep_expiry_statuses()
+            if any(changed.values()):
+                logger.info(f"Expiry sweep updated statuses: {changed}")
+        except Exception as e:
+            logger.error(f"Expiry sweep error: {str(e)}")
+        await asyncio.sleep(EXPIRY_SWEEP_INTERVAL_SECONDS)
+
+background_jobs = []
+
+# ============= ADMIN ROUTES =============
+
+@api_router.get("/admin/indexes")
+async def get_index_report(current_user: dict = Depends(get_current_user)):
+    """Declared vs existing indexes per collection, and the indexes each route relies on"""
+    if current_user['role'] != 'Admin':
+        raise HTTPException(status_code=403, detail="Only Admin can view index status")
+    
+    collections = {}
+    for collection, indexes in INDEXES.items():
+        existing = await db[collection].index_information()
+        declared = [index.document['name'] for index in indexes]
+        collections[collection] = {
+            "declared": declared,
+            "existing": sorted(existing.keys()),
+            "missing": [name for name in declared if name not in existing],
+            "errors": {name: index_errors[f'{collection}.{name}'] for name in declared if f'{collection}.{name}' in index_errors}
+        }
     
-    return Response(
-        content=output.getvalue(),
-        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        headers={'Content-Disposition': 'attachment; filename="assets_export.xlsx"'}
-    )
+    return {"collections": collections, "routes": ROUTE_INDEXES}
+
+@app.exception_handler(DuplicateKeyError)
+async def duplicate_key_handler(request: Request, exc: DuplicateKeyError):
+    """Unique natural keys (PAN, emp_id, serial number...) surface as 409 instead of a 500"""
+    fields = ', '.join((exc.details or {}).get('keyValue', {})) or 'key'
+    return JSONResponse(status_code=409, content={"detail": f"A record with the same {fields} already exists"})
 
 app.include_router(api_router)
 
@@ -1691,7 +3598,18 @@ async def startup():
         )
         await db.users.insert_one(admin.model_dump())
         logger.info("Admin user created")
+    
+    build_sample_workbooks()
+    load_document_templates()
+    start_document_pool()
+    await run_migrations()
+    await ensure_indexes()
+    background_jobs.append(asyncio.create_task(run_expiry_sweeper()))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for job in background_jobs:
+        job.cancel()
+    if document_pool:
+        document_pool.shutdown(wait=False, cancel_futures=True)
     client.close()
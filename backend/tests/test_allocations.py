@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from datetime import datetime, timezone
+
+import server
+
+
+def employee(projects):
+    return {'id': 'e1', 'first_name': 'Asha', 'department': 'SEO', 'status': 'Active', 'projects': projects, 'monthly_gross_inr': 1000}
+
+
+def test_writes_during_a_rebuild_reach_the_new_matrix(monkeypatch):
+    async def load_with_concurrent_write():
+        matrix = server.AllocationMatrix()
+        matrix.set_resource('employees', employee(['c1']))
+        # Lands after the rebuild has read the employee
+        server.record_allocation_write('employees', employee(['c1']), employee(['c2']))
+        matrix.loaded_at = datetime.now(timezone.utc)
+        return matrix
+    
+    monkeypatch.setattr(server, 'allocations', server.AllocationMatrix())
+    monkeypatch.setattr(server, 'load_allocations', load_with_concurrent_write)
+    matrix = asyncio.run(server.get_allocations())
+    
+    assert matrix.resource_utilization('e1')['clients'][0]['client_id'] == 'c2'
+    assert matrix.loaded_at is not None
+    assert server.allocation_writes is None
+
+
+def test_bulk_update_during_a_rebuild_leaves_it_stale(monkeypatch):
+    async def load_with_bulk_update():
+        server.invalidate_allocations()
+        matrix = server.AllocationMatrix()
+        matrix.loaded_at = datetime.now(timezone.utc)
+        return matrix
+    
+    monkeypatch.setattr(server, 'allocations', server.AllocationMatrix())
+    monkeypatch.setattr(server, 'load_allocations', load_with_bulk_update)
+    
+    assert asyncio.run(server.get_allocations()).loaded_at is None
@@ -0,0 +1,43 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def test_batch_filter_applies_per_document_type():
+    request = server.DocumentBatchRequest(document_types=['sla', 'ica', 'offer_letter'], filter={'agreement_status': 'Expired'})
+    queries, skipped = server.batch_queries(request)
+    assert queries == {'sla': {'agreement_status': 'Expired'}, 'ica': {'agreement_status': 'Expired'}}
+    assert skipped == ["offer_letter: none of the filter fields apply to employees, skipped"]
+
+
+def test_batch_filter_mixes_fields_and_ranges():
+    request = server.DocumentBatchRequest(
+        document_types=['sla', 'offer_letter'],
+        filter={'agreement_status': 'Expired', 'department': 'Tech', 'doj_from': '2024-01-01'},
+    )
+    queries, skipped = server.batch_queries(request)
+    assert queries['sla'] == {'agreement_status': 'Expired', 'service': 'Tech'}
+    assert queries['offer_letter'] == {'department': 'Tech', 'doj': {'$gte': '2024-01-01'}}
+    assert skipped == []
+
+
+def test_batch_ids_select_types_without_a_matching_filter():
+    request = server.DocumentBatchRequest(document_types=['sla', 'offer_letter'], ids=['a', 'b'], filter={'agreement_status': 'Expired'})
+    queries, _ = server.batch_queries(request)
+    assert queries['offer_letter'] == {'id': {'$in': ['a', 'b']}}
+
+
+def test_batch_filter_unknown_to_every_type_is_rejected():
+    request = server.DocumentBatchRequest(document_types=['sla', 'offer_letter'], filter={'warranty_status': 'Expired'})
+    with pytest.raises(HTTPException) as excinfo:
+        server.batch_queries(request)
+    assert excinfo.value.status_code == 400
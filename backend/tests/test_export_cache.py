@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server
+
+
+def test_put_replaces_older_versions_only():
+    cache = server.ExportCache(1000)
+    cache.put(('clients', 'csv', 4), b'v4')
+    cache.put(('clients', 'ndjson', 4), b'n4')
+    cache.put(('clients', 'csv', 5), b'v5')
+    
+    assert cache.get(('clients', 'csv', 4)) is None
+    assert cache.get(('clients', 'csv', 5)) == b'v5'
+    assert cache.get(('clients', 'ndjson', 4)) == b'n4'
+
+
+def test_late_put_of_an_older_version_is_dropped():
+    cache = server.ExportCache(1000)
+    cache.put(('clients', 'csv', 5), b'v5')
+    cache.put(('clients', 'csv', 4), b'v4')
+    
+    assert cache.get(('clients', 'csv', 4)) is None
+    assert cache.get(('clients', 'csv', 5)) == b'v5'
+    assert cache.size == 2
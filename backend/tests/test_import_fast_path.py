@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+from datetime import date, datetime
+from io import BytesIO
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import server
+
+
+def contractor(i, **fields):
+    return {
+        'name': f'K{i}', 'doj': '2024-01-01', 'start_date': '2024-01-31', 'tenure_months': 1, 'dob': '1992-02-29',
+        'gender': 'Female', 'pan': 'ABCDE1234F', 'aadhar': '123412341234', 'mobile': '9876543210',
+        'personal_email': f'first.last+k{i}@mail.example.co.in', 'bank_name': 'Bank', 'account_holder': f'K{i}',
+        'account_no': '1234567', 'ifsc': 'BANK0001234', 'address_1': 'Street', 'pincode': '560001', 'city': 'City',
+        'address_2': 'Floor 2', 'department': 'SEO', 'projects': 'c1, c2', 'monthly_retainer_inr': 500.5,
+        'designation': 'Writer', 'approver_user_id': 'user_1', **fields,
+    }
+
+
+ROWS = [
+    contractor(1),
+    # Optional cells left blank take the model defaults
+    contractor(2, gender=None, address_2=None, projects=None, department='Business Development',
+               start_date='2023-02-28', tenure_months=12, monthly_retainer_inr=600),
+    contractor(3, start_date='2024-08-31', tenure_months=6, dob='1990-12-31', department='Others', gender='Other'),
+    # Rows the vectorized checks hand to the row builder
+    contractor(4, personal_email='k4@Example.IN'),
+    contractor(5, department='Design'),
+    contractor(6, tenure_months=2.5),
+    contractor(7, personal_email='k7@localhost'),
+]
+COLUMNS = list(ROWS[0])
+
+
+def xlsx_upload() -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(COLUMNS)
+    date_columns = server.IMPORT_SPECS['contractors']['dates']
+    for row in ROWS:
+        ws.append([datetime.fromisoformat(row[c]) if c in date_columns else row[c] for c in COLUMNS])
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def csv_upload() -> bytes:
+    return pd.DataFrame(ROWS, columns=COLUMNS).to_csv(index=False).encode('utf-8')
+
+
+def ndjson_upload() -> bytes:
+    rows = [{**row, 'projects': server.split_list(row['projects']) if row['projects'] else None} for row in ROWS]
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+
+def comparable(doc: dict) -> dict:
+    # ids and timestamps come from default factories
+    return {k: v for k, v in doc.items() if k not in ('id', 'created_at')}
+
+
+@pytest.mark.parametrize('filename, upload', [
+    ('contractors.xlsx', xlsx_upload), ('contractors.csv', csv_upload), ('contractors.ndjson', ndjson_upload),
+])
+def test_fast_path_matches_row_builder(filename, upload):
+    frame = pd.concat(server.iter_upload_frames(BytesIO(upload()), filename))
+    docs, errors = server.validate_import_frame('contractors', frame)
+    
+    expected, expected_errors = [], []
+    for (_, row), row_number in zip(frame.iterrows(), frame.index + 2):
+        try:
+            expected.append((row_number, comparable(server.doc_from_row('contractors', row))))
+        except Exception as e:
+            expected_errors.append((row_number, str(e)))
+    
+    assert [(n, comparable(doc)) for n, doc in docs] == expected
+    assert errors == expected_errors
+    assert [message.splitlines()[1] for _, message in errors] == ['department', 'personal_email']
+
+
+def test_add_months_matches_calculate_end_date():
+    starts = ['2024-01-31', '2023-01-31', '2024-02-29', '2024-03-31', '2023-12-15', '2024-08-31', '2025-05-01']
+    months = [1, 1, 12, -1, 2, 6, 0]
+    shifted = server.add_months(pd.to_datetime(pd.Series(starts)), pd.Series(months))
+    
+    assert shifted.dt.strftime('%Y-%m-%d').tolist() == [server.calculate_end_date(s, m) for s, m in zip(starts, months)]
+
+
+@pytest.mark.parametrize('start, days, expected', [
+    (date(2025, 3, 1), 30, [('0301', '0331')]),
+    (date(2025, 12, 20), 30, [('1220', '1231'), ('0101', '0119')]),
+    (date(2025, 2, 1), 27, [('0201', '0229')]),
+    (date(2024, 2, 1), 27, [('0201', '0228')]),
+    (date(2025, 12, 31), 59, [('1231', '1231'), ('0101', '0229')]),
+    (date(2025, 1, 1), 365, [('0101', '1231')]),
+])
+def test_birthday_ranges(start, days, expected):
+    assert server.birthday_ranges(start, days) == expected
@@ -0,0 +1,76 @@
+import os
+import sys
+from io import BytesIO
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import server
+
+
+def employee(i, projects):
+    return server.Employee(
+        doj='2024-01-01', work_email=f'e{i}@example.com', emp_id=f'E{i}', first_name=f'F{i}', last_name='L',
+        father_name='F', dob='1990-05-15', mobile='9876543210', personal_email=f'p{i}@example.com',
+        pan='ABCDE1234F', aadhar='123412341234', uan='1', pf_account_no='1', bank_name='Bank',
+        account_no='1', ifsc='BANK0001234', branch='Main', address='Street', pincode='560001', city='City',
+        monthly_gross_inr=50000, department='SEO', projects=projects, approver_user_id='user_1',
+    ).model_dump()
+
+
+DOCS = [employee(1, ['c1', 'c2']), employee(2, ['c3']), employee(3, [])]
+COLUMNS = server.EXPORT_COLUMNS['employees']
+
+
+def ndjson_export() -> bytes:
+    return server.ndjson_chunk(DOCS, COLUMNS)
+
+
+def parquet_export() -> bytes:
+    fields = server.Employee.model_fields
+    schema = pa.schema([server.arrow_field(column, fields[column].annotation) for column in COLUMNS])
+    sink = server.ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    return server.parquet_chunk(writer, sink, DOCS, schema) + server.close_parquet(writer, sink)
+
+
+@pytest.mark.parametrize('filename, export', [('employees.ndjson', ndjson_export), ('employees.parquet', parquet_export)])
+def test_export_reimports_list_columns(filename, export):
+    frames = list(server.iter_upload_frames(BytesIO(export()), filename))
+    docs, errors = server.validate_import_frame('employees', pd.concat(frames))
+    
+    assert errors == []
+    assert [doc['projects'] for _, doc in docs] == [['c1', 'c2'], ['c3'], []]
+
+
+def test_row_builder_accepts_list_cells():
+    frame = next(server.iter_upload_frames(BytesIO(parquet_export()), 'employees.parquet'))
+    row = frame.iloc[0]
+    
+    assert server.doc_from_row('employees', row)['projects'] == ['c1', 'c2']
+
+
+def test_csv_keeps_leading_zeros_and_blank_cells():
+    header = ('name,doj,start_date,tenure_months,dob,pan,aadhar,mobile,personal_email,bank_name,account_holder,'
+              'account_no,ifsc,address_1,pincode,city,address_2,department,monthly_retainer_inr,designation,approver_user_id')
+    rows = [
+        'K1,2024-01-01,2025-01-01,6,1991-01-01,ABCDE1234F,012345678901,09876543210,k1@example.com,Bank,K1,'
+        '0012345,BANK0001234,Street,011001,City,,SEO,500,Writer,user_1',
+        'K2,2024-01-01,2025-01-01,6,1991-01-01,ABCDE1235F,123412341234,9876543210,k2@example.com,Bank,K2,'
+        ',BANK0001234,Street,560001,City,Floor 2,SEO,500.5,Writer,user_1',
+    ]
+    csv = '\n'.join([header, *rows]).encode('utf-8')
+    frames = list(server.iter_upload_frames(BytesIO(csv), 'contractors.csv', chunk_size=1))
+    docs, errors = server.validate_import_frame('contractors', pd.concat(frames))
+    
+    [(_, doc)] = docs
+    assert (doc['aadhar'], doc['pincode'], doc['account_no'], doc['mobile']) == ('012345678901', '011001', '0012345', '09876543210')
+    assert doc['address_2'] == ''
+    assert errors == [(3, 'account_no is required')]
@@ -0,0 +1,40 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import server
+
+
+def test_descending_keyset_keeps_null_sort_values():
+    after = server.keyset_filter([('amount_inr', -1), ('id', -1)], [100.0, 'client_b'])
+    
+    assert after == {'$or': [
+        {'$or': [{'amount_inr': {'$lt': 100.0}}, {'amount_inr': None}]},
+        {'amount_inr': 100.0, '$or': [{'id': {'$lt': 'client_b'}}, {'id': None}]},
+    ]}
+
+
+def test_ascending_keyset_past_nulls():
+    after = server.keyset_filter([('amount_inr', 1), ('id', 1)], [None, 'client_b'])
+    
+    assert after == {'$or': [
+        {'amount_inr': {'$ne': None}},
+        {'amount_inr': None, 'id': {'$gt': 'client_b'}},
+    ]}
+
+
+def test_multi_key_sort_needs_declared_index():
+    _, sort = server.build_list_query('clients', {}, '-end_date,-client_name')
+    assert sort == [('end_date', -1), ('client_name', -1)]
+    assert any(index.document['name'] == 'end_date_client_name_id' for index in server.sort_indexes('clients'))
+    
+    for sort_by in ('start_date,amount_inr', 'end_date,-client_name', 'amount_inr,-id'):
+        with pytest.raises(server.HTTPException) as error:
+            server.build_list_query('clients', {}, sort_by)
+        assert error.value.status_code == 400
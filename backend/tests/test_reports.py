@@ -0,0 +1,26 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import server
+
+
+CLIENT = server.Client(
+    client_name='ABC Corp', address='123 Main St', start_date='2025-01-01', tenure_months=12, service='PPC',
+    amount_inr=50000, authorised_signatory='John Doe', signatory_designation='CEO', gst='GST123', poc_name='Jane',
+    poc_email='jane@example.com', poc_designation='Manager', poc_mobile='9876543210', approver_user_id='user_1',
+).model_dump()
+
+
+@pytest.mark.parametrize('department', [None, 'PPC'])
+def test_client_profitability_without_active_staff(department):
+    report = server.build_client_profitability([CLIENT], [], [], department)
+    
+    assert report['total_cost'].tolist() == [0.0]
+    assert report['profit'].tolist() == [50000.0]